@@ -0,0 +1,267 @@
+import argparse
+import heapq
+import os
+import tempfile
+import time
+from array import array
+from collections import deque
+
+import sorting_engine
+
+# External merge sort for integer files larger than memory.
+#
+# Phase 1 reads the input in blocks sized from the memory budget, sorts
+# each block with one of the engine's algorithms and spills it to a
+# temporary binary run file. Phase 2 merges the runs with a heap-based
+# k-way merge (heapq.merge), reading every run through a fixed-size buffer
+# and writing the output in blocks. When there are more runs than the
+# fan-in allows, intermediate merge passes combine them first.
+#
+# Supported inputs are binary files of fixed-width native integers (2, 4
+# or 8 bytes) and newline-delimited text files of integers.
+
+TYPECODES = {2: 'h', 4: 'i', 8: 'q'}
+
+# Peak in-memory cost of one chunk element while it is sorted: the list
+# slot (8 bytes) and int object (up to 40 for 64-bit values) of the chunk
+# itself, the bucket slots of a radix pass or the auxiliary list of a merge
+# sort (about 10), and the raw block it was read from while tolist() runs
+# (up to 8), rounded up for allocator slack. Chunks are sorted in place
+# and spilled in slices, so nothing else scales with the chunk. Used to
+# turn a byte budget into item counts.
+ITEM_COST = 72
+
+# Items converted per slice when a sorted chunk is written out
+SPILL_ITEMS = 1 << 16
+
+
+def parse_size(text):
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _read_binary_chunks(path, typecode, chunk_items, raw=False):
+    # Lists of values, or the raw arrays when `raw` is set
+    with open(path, 'rb') as f:
+        while True:
+            block = array(typecode)
+            try:
+                block.fromfile(f, chunk_items)
+            except EOFError:
+                # fromfile keeps the items it managed to read
+                pass
+            if not block:
+                return
+            if raw:
+                yield block
+            else:
+                values = block.tolist()
+                del block
+                yield values
+                # Drop it before the next block is read
+                del values
+
+
+def _read_text_chunks(path, chunk_items):
+    # Lines are converted as they are read, so chunks hold chunk_items
+    # values however long the lines are
+    with open(path, 'r') as f:
+        chunk = []
+        for line in f:
+            if line.strip():
+                chunk.append(int(line))
+                if len(chunk) >= chunk_items:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+
+def _read_run(path, typecode, buffer_items):
+    with open(path, 'rb') as f:
+        while True:
+            block = array(typecode)
+            try:
+                block.fromfile(f, buffer_items)
+            except EOFError:
+                pass
+            if not block:
+                return
+            yield from block
+
+
+class _BlockWriter:
+    # Buffers output values and flushes them in blocks
+    def __init__(self, path, typecode, buffer_items, text=False):
+        self.file = open(path, 'w' if text else 'wb')
+        self.typecode = typecode
+        self.buffer_items = buffer_items
+        self.text = text
+        self.buffer = []
+
+    def write_all(self, values):
+        buffer = self.buffer
+        append = buffer.append
+        limit = self.buffer_items
+        for v in values:
+            append(v)
+            if len(buffer) >= limit:
+                self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.text:
+            self.file.write("\n".join(map(str, self.buffer)))
+            self.file.write("\n")
+        else:
+            array(self.typecode, self.buffer).tofile(self.file)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def _spill(chunk, typecode, tmp_dir):
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, 'wb') as f:
+        if isinstance(chunk, list):
+            for i in range(0, len(chunk), SPILL_ITEMS):
+                array(typecode, chunk[i:i + SPILL_ITEMS]).tofile(f)
+        else:
+            chunk.astype(typecode, copy=False).tofile(f)
+    return path
+
+
+def _sort_chunk(chunk, typecode, algorithm, use_numpy):
+    # Lists are sorted in place by the engine; NumPy sorts a zero-copy
+    # view of the raw block into one new array
+    if use_numpy:
+        np = sorting_engine.np
+        if isinstance(chunk, list):
+            chunk = np.array(chunk, dtype=typecode)
+        else:
+            chunk = np.frombuffer(chunk, dtype=typecode)
+        return sorting_engine.NUMPY_ALGORITHMS[algorithm](chunk)
+    deque(sorting_engine.sort_events(chunk, algorithm), maxlen=0)
+    return chunk
+
+
+def _merge_runs(runs, out_path, typecode, buffer_items, text=False):
+    readers = [_read_run(path, typecode, buffer_items) for path in runs]
+    writer = _BlockWriter(out_path, typecode, buffer_items, text)
+    try:
+        writer.write_all(heapq.merge(*readers))
+    finally:
+        writer.close()
+
+
+def external_sort(in_path, out_path, fmt="binary", width=8, memory_limit=64 << 20,
+                  algorithm="radix_lsd", use_numpy=False, max_fan_in=64, tmp_dir=None):
+    # Sorts in_path into out_path using at most about `memory_limit` bytes
+    # of Python data; returns a report dict with phase timings and MB/s.
+    if fmt not in ("binary", "text"):
+        raise ValueError(f"Unknown format: {fmt}")
+    if width not in TYPECODES:
+        raise ValueError(f"Unsupported integer width: {width}")
+    if max_fan_in < 2:
+        raise ValueError("max_fan_in must be at least 2")
+
+    typecode = TYPECODES[width]
+    text = fmt == "text"
+    if use_numpy:
+        if sorting_engine.np is None:
+            raise ImportError("NumPy is required for use_numpy=True")
+        if algorithm not in sorting_engine.NUMPY_ALGORITHMS:
+            raise ValueError(f"No NumPy path for algorithm: {algorithm}")
+    chunk_items = max(1024, memory_limit // ITEM_COST)
+    input_bytes = os.path.getsize(in_path)
+
+    start = time.perf_counter()
+    runs = []
+    items = 0
+    try:
+        chunks = (_read_text_chunks(in_path, chunk_items) if text
+                  else _read_binary_chunks(in_path, typecode, chunk_items, raw=use_numpy))
+        for chunk in chunks:
+            items += len(chunk)
+            chunk = _sort_chunk(chunk, typecode, algorithm, use_numpy)
+            runs.append(_spill(chunk, typecode, tmp_dir))
+            del chunk
+        initial_runs = len(runs)
+        split_time = time.perf_counter() - start
+
+        # Intermediate passes until one final merge fits the fan-in
+        passes = 0
+        while len(runs) > max_fan_in:
+            passes += 1
+            buffer_items = max(256, chunk_items // (max_fan_in + 1))
+            merged = []
+            for i in range(0, len(runs), max_fan_in):
+                group = runs[i:i + max_fan_in]
+                fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+                os.close(fd)
+                _merge_runs(group, path, typecode, buffer_items)
+                for old in group:
+                    os.remove(old)
+                merged.append(path)
+            runs = merged
+
+        passes += 1
+        buffer_items = max(256, chunk_items // (len(runs) + 1))
+        _merge_runs(runs, out_path, typecode, buffer_items, text)
+    finally:
+        for path in runs:
+            if os.path.exists(path):
+                os.remove(path)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "input_bytes": input_bytes,
+        "items": items,
+        "initial_runs": initial_runs,
+        "merge_passes": passes,
+        "memory_limit": memory_limit,
+        "split_time": split_time,
+        "merge_time": elapsed - split_time,
+        "elapsed": elapsed,
+        "mb_per_s": input_bytes / (1 << 20) / elapsed if elapsed else 0.0,
+    }
+
+
+def format_report(report):
+    return (f"Sorted {report['items']} items ({report['input_bytes'] / (1 << 20):.1f} MB) "
+            f"in {report['elapsed']:.2f}s\n"
+            f"  runs: {report['initial_runs']}   merge passes: {report['merge_passes']}   "
+            f"memory limit: {report['memory_limit'] / (1 << 20):.1f} MB\n"
+            f"  split: {report['split_time']:.2f}s   merge: {report['merge_time']:.2f}s\n"
+            f"  throughput: {report['mb_per_s']:.2f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sort an integer file larger than memory")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=["binary", "text"], default="binary")
+    parser.add_argument("--width", type=int, choices=sorted(TYPECODES), default=8,
+                        help="bytes per integer for binary files")
+    parser.add_argument("--memory", type=parse_size, default=64 << 20,
+                        help="memory budget, e.g. 256M (default 64M)")
+    parser.add_argument("--algorithm", choices=list(sorting_engine.ALGORITHMS),
+                        default="radix_lsd", help="engine algorithm for in-memory chunks")
+    parser.add_argument("--numpy", action="store_true", help="use the engine's NumPy path")
+    parser.add_argument("--fan-in", type=int, default=64)
+    parser.add_argument("--tmp-dir")
+    args = parser.parse_args(argv)
+
+    report = external_sort(args.input, args.output, args.format, args.width, args.memory,
+                           args.algorithm, args.numpy, args.fan_in, args.tmp_dir)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
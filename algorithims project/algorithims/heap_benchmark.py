@@ -0,0 +1,136 @@
+import argparse
+import json
+import random
+import sys
+import time
+from array import array
+
+import heap_engine
+import sorting_engine
+from sort_benchmark import environment
+
+# Compares heap arities on two workloads:
+#   sort  - heap sort of n random integers
+#   queue - priority-queue "hold" model: n pushes to fill the queue, then
+#           n rounds of pop-max followed by push of a random value
+# Comparisons and moves come from a counted run of the event generators;
+# wall time comes from the event-free functions, so it is not inflated by
+# per-event overhead. Storage can be a list or a contiguous array('q').
+
+WORKLOADS = ("sort", "queue")
+STORAGE = ("list", "array")
+
+
+def _make_values(n, seed):
+    rng = random.Random(f"{seed}-heap-{n}")
+    return [rng.randrange(1 << 40) for _ in range(2 * n)]
+
+
+def _container(values, storage):
+    return array('q', values) if storage == "array" else list(values)
+
+
+def _count_sort(values, arity):
+    stats = sorting_engine.SortStats()
+    stats.consume(heap_engine.heap_sort(list(values), arity))
+    return stats
+
+
+def _time_sort(values, arity, storage):
+    a = _container(values, storage)
+    start = time.perf_counter()
+    heap_engine.heapsort(a, arity)
+    elapsed = time.perf_counter() - start
+    if list(a) != sorted(values):
+        raise AssertionError(f"heapsort failed with arity {arity}")
+    return elapsed
+
+
+def _count_queue(values, n, arity):
+    stats = sorting_engine.SortStats()
+    heap = []
+    for x in values[:n]:
+        stats.consume(heap_engine.push_events(heap, x, arity))
+    for x in values[n:]:
+        stats.consume(heap_engine.pop_events(heap, arity))
+        stats.consume(heap_engine.push_events(heap, x, arity))
+    return stats
+
+
+def _time_queue(values, n, arity, storage):
+    heap = _container([], storage)
+    push = heap_engine.push
+    pop = heap_engine.pop
+    start = time.perf_counter()
+    for x in values[:n]:
+        push(heap, x, arity)
+    for x in values[n:]:
+        pop(heap, arity)
+        push(heap, x, arity)
+    elapsed = time.perf_counter() - start
+    if not heap_engine.is_heap(heap, arity=arity):
+        raise AssertionError(f"queue lost the heap property with arity {arity}")
+    return elapsed
+
+
+def run_case(workload, arity, n, seed=0, storage="list", repeat=1):
+    values = _make_values(n, seed)
+    if workload == "sort":
+        values = values[:n]
+        stats = _count_sort(values, arity)
+        wall_time = min(_time_sort(values, arity, storage) for _ in range(repeat))
+    else:
+        stats = _count_queue(values, n, arity)
+        wall_time = min(_time_queue(values, n, arity, storage) for _ in range(repeat))
+    return {
+        "workload": workload,
+        "arity": arity,
+        "n": n,
+        "storage": storage,
+        "seed": seed,
+        "wall_time": wall_time,
+        "comparisons": stats.comparisons,
+        "moves": stats.writes,
+    }
+
+
+def format_table(results):
+    header = f"{'workload':<8} {'arity':>5} {'storage':<7} {'n':>9} {'time (s)':>10} " \
+             f"{'compares':>12} {'moves':>11}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(f"{r['workload']:<8} {r['arity']:>5} {r['storage']:<7} {r['n']:>9} "
+                     f"{r['wall_time']:>10.4f} {r['comparisons']:>12} {r['moves']:>11}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark d-ary heaps by arity")
+    parser.add_argument("--workloads", nargs="+", default=list(WORKLOADS), choices=WORKLOADS)
+    parser.add_argument("--arities", nargs="+", type=int, default=list(heap_engine.ARITIES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10 ** 4, 10 ** 5])
+    parser.add_argument("--storage", nargs="+", default=["list"], choices=STORAGE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for workload in args.workloads:
+        for n in args.sizes:
+            for storage in args.storage:
+                for arity in args.arities:
+                    r = run_case(workload, arity, n, args.seed, storage, args.repeat)
+                    results.append(r)
+                    print(f"[INFO] {workload} arity={arity} {storage} n={n}: "
+                          f"{r['wall_time']:.4f}s", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
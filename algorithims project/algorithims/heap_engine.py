@@ -0,0 +1,286 @@
+from sorting_engine import BOUNDARY, COMPARE, WRITE
+
+# Headless max-heap engine shared by the sorting engine and the heap
+# visualizer.
+#
+# Heaps are d-ary: node i has children arity*i + 1 .. arity*i + arity and
+# parent (i - 1) // arity. Wider heaps are shallower (fewer moves per
+# sift) but need arity - 1 comparisons per level to find the largest child.
+#
+# Sift-down is iterative and hole-based: the value being placed is lifted
+# out, larger children move up into the hole one level at a time, and the
+# value is written once where it belongs. That is one write per level
+# instead of a three-assignment swap.
+#
+# The generators yield the engine's compact events:
+#   (COMPARE, i, j)    - two positions were compared
+#   (WRITE, k, value)  - a[k] = value
+#   (BOUNDARY, k, 0)   - the heap now occupies a[lo:k]; a[k:hi] is sorted
+# The plain functions at the bottom run the same algorithm without events
+# for headless use at full speed.
+#
+# Two sort-down modes are available:
+#   "classic"   - each level compares the children with each other and
+#                 then the largest child with the value being placed
+#   "bottom_up" - Wegener's bottom-up heapsort: follow the largest children
+#                 to a leaf without looking at the value, then climb back
+#                 to where it belongs. Since the value taken from the end
+#                 of the heap is usually small it ends up near the bottom,
+#                 so this needs about n log2 n + O(n) comparisons instead
+#                 of about 2 n log2 n for a binary heap.
+
+ARITIES = (2, 3, 4, 8)
+MODES = ("classic", "bottom_up")
+
+
+def children(i, n, arity=2):
+    first = arity * i + 1
+    return range(first, min(first + arity, n))
+
+
+def parent(i, arity=2):
+    return (i - 1) // arity
+
+
+def is_heap(a, n=None, arity=2):
+    if n is None:
+        n = len(a)
+    return all(not a[(i - 1) // arity] < a[i] for i in range(1, n))
+
+
+def _sift(a, x, hole, n, base, arity=2, placed=True):
+    # Places value x, starting at heap position `hole`, into a[base:base+n].
+    # `placed` says x is already stored at the hole; otherwise the slot is
+    # vacant and x is always written.
+    start = hole
+    child = arity * hole + 1
+    while child < n:
+        c = base + child
+        for k in range(c + 1, base + min(child + arity, n)):
+            yield (COMPARE, c, k)
+            if a[k] > a[c]:
+                c = k
+        yield (COMPARE, base + hole, c)
+        if not a[c] > x:
+            break
+        a[base + hole] = a[c]
+        yield (WRITE, base + hole, a[c])
+        hole = c - base
+        child = arity * hole + 1
+    if hole != start or not placed:
+        a[base + hole] = x
+        yield (WRITE, base + hole, x)
+    return hole
+
+
+def _sift_bottom_up(a, x, n, base, arity=2):
+    # Places x into the heap a[base:base+n] whose root slot is vacant
+    j = 0
+    child = 1
+    while child < n:
+        c = base + child
+        for k in range(c + 1, base + min(child + arity, n)):
+            yield (COMPARE, c, k)
+            if a[k] > a[c]:
+                c = k
+        j = c - base
+        child = arity * j + 1
+
+    # Climb from the leaf until a value not smaller than x is found
+    while j > 0:
+        yield (COMPARE, base + j, base)
+        if not a[base + j] < x:
+            break
+        j = (j - 1) // arity
+
+    # Everything on the path above j moves up one level; x takes j
+    path = []
+    k = j
+    while k > 0:
+        path.append(k)
+        k = (k - 1) // arity
+    for k in reversed(path):
+        p = (k - 1) // arity
+        a[base + p] = a[base + k]
+        yield (WRITE, base + p, a[base + k])
+    # a[j] still holds the value just copied up, so x is always written
+    a[base + j] = x
+    yield (WRITE, base + j, x)
+    return j
+
+
+def sift_down(a, root, n, base=0, arity=2):
+    # Restores the heap below `root`; returns the value's final position
+    return (yield from _sift(a, a[base + root], root, n, base, arity))
+
+
+def sift_up(a, hole, base=0, arity=2):
+    # Moves a[base + hole] up past smaller parents; returns its final position
+    x = a[base + hole]
+    start = hole
+    while hole > 0:
+        p = (hole - 1) // arity
+        yield (COMPARE, base + p, base + hole)
+        if not a[base + p] < x:
+            break
+        a[base + hole] = a[base + p]
+        yield (WRITE, base + hole, a[base + p])
+        hole = p
+    if hole != start:
+        a[base + hole] = x
+        yield (WRITE, base + hole, x)
+    return hole
+
+
+def build_heap(a, lo=0, hi=None, arity=2):
+    # Floyd's bottom-up construction in O(n)
+    if hi is None:
+        hi = len(a)
+    n = hi - lo
+    for i in range((n - 2) // arity, -1, -1):
+        yield from _sift(a, a[lo + i], i, n, lo, arity)
+
+
+def sort_down(a, lo=0, hi=None, arity=2, mode="classic"):
+    # Repeatedly moves the maximum of the heap a[lo:hi] behind the heap
+    if mode not in MODES:
+        raise ValueError(f"Unknown heap sort mode: {mode}")
+    if hi is None:
+        hi = len(a)
+    sift = _sift_bottom_up if mode == "bottom_up" else None
+    for end in range(hi - lo - 1, 0, -1):
+        x = a[lo + end]
+        a[lo + end] = a[lo]
+        yield (WRITE, lo + end, a[lo])
+        yield (BOUNDARY, lo + end, 0)
+        if sift:
+            yield from sift(a, x, end, lo, arity)
+        else:
+            yield from _sift(a, x, 0, end, lo, arity, placed=False)
+    if hi > lo:
+        yield (BOUNDARY, lo, 0)
+
+
+def heap_sort_range(a, lo, hi, arity=2, mode="classic"):
+    if hi - lo < 2:
+        return
+    yield from build_heap(a, lo, hi, arity)
+    yield from sort_down(a, lo, hi, arity, mode)
+
+
+def heap_sort(a, arity=2, mode="classic"):
+    yield from heap_sort_range(a, 0, len(a), arity, mode)
+
+
+def push_events(heap, x, arity=2):
+    # Priority-queue insert on a list-backed heap
+    heap.append(x)
+    yield from sift_up(heap, len(heap) - 1, 0, arity)
+
+
+def pop_events(heap, arity=2):
+    # Removes and returns the maximum
+    top = heap[0]
+    x = heap.pop()
+    if heap:
+        yield from _sift(heap, x, 0, len(heap), 0, arity, placed=False)
+    return top
+
+
+# Event-free versions
+
+def _sift_plain(a, x, hole, n, arity=2):
+    child = arity * hole + 1
+    while child < n:
+        best = a[child]
+        if arity == 2:
+            if child + 1 < n and a[child + 1] > best:
+                child += 1
+                best = a[child]
+        else:
+            for k in range(child + 1, min(child + arity, n)):
+                if a[k] > best:
+                    child = k
+                    best = a[k]
+        if not best > x:
+            break
+        a[hole] = best
+        hole = child
+        child = arity * hole + 1
+    a[hole] = x
+
+
+def _sift_bottom_up_plain(a, x, n, arity=2):
+    j = 0
+    child = 1
+    while child < n:
+        best = a[child]
+        for k in range(child + 1, min(child + arity, n)):
+            if a[k] > best:
+                child = k
+                best = a[k]
+        j = child
+        child = arity * j + 1
+    while j > 0 and a[j] < x:
+        j = (j - 1) // arity
+    # Rotate the path up by one level with x entering at j
+    while j > 0:
+        x, a[j] = a[j], x
+        j = (j - 1) // arity
+    a[0] = x
+
+
+def heapify(a, arity=2):
+    # In-place max-heap construction
+    n = len(a)
+    for i in range((n - 2) // arity, -1, -1):
+        _sift_plain(a, a[i], i, n, arity)
+
+
+def heapsort(a, arity=2, mode="classic"):
+    # In-place ascending heap sort without events
+    if mode not in MODES:
+        raise ValueError(f"Unknown heap sort mode: {mode}")
+    heapify(a, arity)
+    bottom_up = mode == "bottom_up"
+    for end in range(len(a) - 1, 0, -1):
+        x = a[end]
+        a[end] = a[0]
+        if bottom_up:
+            _sift_bottom_up_plain(a, x, end, arity)
+        else:
+            _sift_plain(a, x, 0, end, arity)
+
+
+def push(heap, x, arity=2):
+    heap.append(x)
+    hole = len(heap) - 1
+    while hole > 0:
+        p = (hole - 1) // arity
+        if not heap[p] < x:
+            break
+        heap[hole] = heap[p]
+        hole = p
+    heap[hole] = x
+
+
+def pop(heap, arity=2):
+    top = heap[0]
+    x = heap.pop()
+    if heap:
+        _sift_plain(heap, x, 0, len(heap), arity)
+    return top
+
+
+def sort(data, key=None, arity=2, mode="classic"):
+    # Returns a new sorted list. With a key function every key is computed
+    # once; records are decorated as (key, index, value) so ties fall back
+    # to the original order and values are never compared. Bottom-up mode
+    # is the one to pick when comparing keys is expensive.
+    if key is None:
+        a = list(data)
+        heapsort(a, arity, mode)
+        return a
+    decorated = [(key(v), i, v) for i, v in enumerate(data)]
+    heapsort(decorated, arity, mode)
+    return [v for _, _, v in decorated]
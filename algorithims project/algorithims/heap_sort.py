@@ -1,9 +1,64 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import random
+from tkinter import ttk, messagebox, filedialog
+import json
 import math
-import time
-from threading import Thread
+import random
+from array import array
+import heap_engine
+import priority_queue
+from sort_trace import TraceRecorder
+from sorting_engine import BOUNDARY, COMPARE, WRITE, SortStats
+
+MAX_SIZE = 20000
+BATCH_SIZE = 100  # heap elements per event applied in one animation tick
+
+# Heap tree view
+LEVEL_HEIGHT = 80
+NODE_RADIUS = 25
+NODE_GAP = 60  # world pixels per node on the widest level
+MIN_NODE_GAP = 12  # levels denser than this on screen are collapsed
+LOD_BAR_HEIGHT = 60
+MAX_ZOOM = 2.0
+
+# Step log. Every displayed event is kept as one (op, a, b, old) record:
+#   (COMPARE, i, j, 0)
+#   (WRITE, k, value, replaced value)
+#   (BOUNDARY, new heap size, old heap size, 0)
+#   (RESIZE, new length, old length, value appended or dropped)
+# Each record can be applied and undone on its own, so stepping either way
+# is O(1) and no array snapshots are stored. RESIZE only exists in the log,
+# for priority-queue operations that grow or shrink the heap.
+STEP_FIELDS = 4
+RESIZE = 100
+
+
+def redo_step(values, heap_size, op, a, b, old):
+    # Applies one step record to `values`; returns the new heap size
+    if op == WRITE:
+        values[a] = b
+    elif op == BOUNDARY:
+        return a
+    elif op == RESIZE:
+        if a > b:
+            values.append(old)
+        else:
+            values.pop()
+        return a
+    return heap_size
+
+
+def undo_step(values, heap_size, op, a, b, old):
+    if op == WRITE:
+        values[a] = old
+    elif op == BOUNDARY:
+        return b
+    elif op == RESIZE:
+        if a > b:
+            values.pop()
+        else:
+            values.append(old)
+        return b
+    return heap_size
 
 class HeapSortVisualizer:
     def __init__(self, root):
@@ -17,10 +72,25 @@ class HeapSortVisualizer:
         self.speed = 50
         self.array_size = 15  # Smaller for heap visualization
         self.comparisons = 0
-        self.swaps = 0
-        self.steps = []
-        self.current_step = 0
+        self.moves = 0
+        self.steps = array('q')  # step log, STEP_FIELDS values per step
+        self.current_step = 0  # steps of the log applied to the display
         self.is_heapified = False
+        self.heap_size = 0  # a[heap_size:] is in its final sorted position
+        self.arity = 2
+        self.events = None
+        self.after_id = None
+        self.queue = None  # IndexedHeap over heap_array for queue operations
+        self.next_item = 0
+        self.resized = False
+        self.heap_items = {}  # node -> (oval, value text) for the visible nodes
+        self.lod_items = {}  # node -> bar geometry for collapsed subtrees
+        self.layout_key = None  # (size, arity, canvas width) of the layout
+        self.view_key = None  # (zoom, pan x, pan y, canvas height) of heap_items
+        self.highlighted = []
+        self.array_items = []
+        self.array_key = None
+        self.array_highlighted = []
         
         self.create_widgets()
         self.generate_new_array()
@@ -42,8 +112,8 @@ class HeapSortVisualizer:
         # Array size control
         tk.Label(top_control, text="Array Size:", bg='#34495e', fg='white',
                 font=('Arial', 10)).grid(row=0, column=0, padx=5)
-        self.size_slider = tk.Scale(top_control, from_=5, to=20, orient=tk.HORIZONTAL,
-                                   length=150, bg='#34495e', fg='white', 
+        self.size_slider = tk.Scale(top_control, from_=5, to=MAX_SIZE, orient=tk.HORIZONTAL,
+                                   length=250, bg='#34495e', fg='white', 
                                    highlightthickness=0, troughcolor='#2c3e50')
         self.size_slider.set(15)
         self.size_slider.grid(row=0, column=1, padx=5)
@@ -57,6 +127,19 @@ class HeapSortVisualizer:
         self.speed_slider.set(50)
         self.speed_slider.grid(row=0, column=3, padx=5)
         
+        # Heap arity (children per node)
+        tk.Label(top_control, text="Arity:", bg='#34495e', fg='white',
+                font=('Arial', 10)).grid(row=0, column=4, padx=5)
+        self.arity_var = tk.IntVar(value=2)
+        tk.OptionMenu(top_control, self.arity_var, *heap_engine.ARITIES,
+                     command=self.set_arity).grid(row=0, column=5, padx=5)
+        
+        # Sort-down strategy
+        tk.Label(top_control, text="Mode:", bg='#34495e', fg='white',
+                font=('Arial', 10)).grid(row=0, column=6, padx=5)
+        self.mode_var = tk.StringVar(value="classic")
+        tk.OptionMenu(top_control, self.mode_var, *heap_engine.MODES).grid(row=0, column=7, padx=5)
+        
         # Buttons Frame
         button_frame = tk.Frame(control_frame, bg='#34495e')
         button_frame.pack(pady=10)
@@ -66,7 +149,9 @@ class HeapSortVisualizer:
             ("🔢 New Array", self.generate_new_array, '#3498db'),
             ("⚡ Build Max Heap", self.build_max_heap, '#9b59b6'),
             ("📊 Heap Sort", self.start_heap_sort, '#2ecc71'),
+            ("⏮ Prev Step", self.prev_step, '#f39c12'),
             ("⏭ Next Step", self.next_step, '#f39c12'),
+            ("💾 Export Steps", self.export_steps, '#34495e'),
             ("🔄 Reset", self.reset_visualization, '#e74c3c'),
             ("📝 Manual Input", self.manual_input, '#1abc9c')
         ]
@@ -77,6 +162,32 @@ class HeapSortVisualizer:
                           padx=15, pady=8, relief=tk.RAISED, borderwidth=2)
             btn.grid(row=0, column=i, padx=5)
         
+        # Priority-queue operations on the built max heap; an empty field
+        # means a random index or value
+        queue_frame = tk.Frame(control_frame, bg='#34495e')
+        queue_frame.pack(pady=5)
+        
+        tk.Label(queue_frame, text="Priority Queue  Index:", bg='#34495e', fg='white',
+                font=('Arial', 10)).grid(row=0, column=0, padx=5)
+        self.index_entry = tk.Entry(queue_frame, width=6)
+        self.index_entry.grid(row=0, column=1, padx=5)
+        tk.Label(queue_frame, text="Value:", bg='#34495e', fg='white',
+                font=('Arial', 10)).grid(row=0, column=2, padx=5)
+        self.value_entry = tk.Entry(queue_frame, width=6)
+        self.value_entry.grid(row=0, column=3, padx=5)
+        
+        queue_buttons = [
+            ("Push", self.queue_push),
+            ("Pop Max", self.queue_pop),
+            ("Increase Key", lambda: self.queue_change(True)),
+            ("Decrease Key", lambda: self.queue_change(False)),
+            ("Remove", self.queue_remove)
+        ]
+        for i, (text, command) in enumerate(queue_buttons):
+            tk.Button(queue_frame, text=text, command=command,
+                     bg='#8e44ad', fg='white', font=('Arial', 9, 'bold'),
+                     padx=10, pady=4).grid(row=0, column=i + 4, padx=3)
+        
         # Statistics Frame
         stats_frame = tk.Frame(control_frame, bg='#2c3e50')
         stats_frame.pack(pady=10)
@@ -84,7 +195,7 @@ class HeapSortVisualizer:
         self.stats_labels = {}
         stats = [
             ("Comparisons:", "comparisons"),
-            ("Swaps:", "swaps"),
+            ("Moves:", "moves"),
             ("Array Size:", "size"),
             ("Time Complexity:", "complexity"),
             ("Space Complexity:", "space_complexity")
@@ -98,6 +209,14 @@ class HeapSortVisualizer:
                                              fg='#ecf0f1', font=('Arial', 10, 'bold'))
             self.stats_labels[key].grid(row=0, column=i*2+1, padx=5)
         
+        # Both sort-down modes on the current input, side by side
+        for i, mode in enumerate(heap_engine.MODES):
+            tk.Label(stats_frame, text=f"{mode.replace('_', '-').title()}:", bg='#2c3e50',
+                    fg='#bdc3c7', font=('Arial', 10)).grid(row=1, column=i*2, padx=5)
+            self.stats_labels[mode] = tk.Label(stats_frame, text="-", bg='#2c3e50',
+                                              fg='#ecf0f1', font=('Arial', 10, 'bold'))
+            self.stats_labels[mode].grid(row=1, column=i*2+1, columnspan=3, padx=5, sticky=tk.W)
+        
         # Main Visualization Area
         vis_frame = tk.Frame(self.root, bg='#2c3e50')
         vis_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -109,6 +228,7 @@ class HeapSortVisualizer:
         
         self.array_canvas = tk.Canvas(array_frame, bg='#1a1a2e', highlightthickness=0)
         self.array_canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.array_canvas.bind("<Configure>", lambda e: self.draw_array())
         
         # Heap Tree Visualization (right)
         heap_frame = tk.LabelFrame(vis_frame, text="Heap Tree Visualization", 
@@ -117,6 +237,14 @@ class HeapSortVisualizer:
         
         self.heap_canvas = tk.Canvas(heap_frame, bg='#1a1a2e', highlightthickness=0)
         self.heap_canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.heap_canvas.bind("<Configure>", lambda e: self.draw_heap())
+        # Scroll to zoom, drag to pan, double-click to fit
+        self.heap_canvas.bind("<MouseWheel>", lambda e: self.zoom_heap(e.x, 1.25 if e.delta > 0 else 0.8))
+        self.heap_canvas.bind("<Button-4>", lambda e: self.zoom_heap(e.x, 1.25))
+        self.heap_canvas.bind("<Button-5>", lambda e: self.zoom_heap(e.x, 0.8))
+        self.heap_canvas.bind("<ButtonPress-1>", self.start_pan)
+        self.heap_canvas.bind("<B1-Motion>", self.pan_heap)
+        self.heap_canvas.bind("<Double-Button-1>", lambda e: self.fit_heap())
         
         # Info Panel
         info_frame = tk.Frame(self.root, bg='#34495e')
@@ -129,6 +257,7 @@ class HeapSortVisualizer:
         self.info_text.insert(tk.END, "1. Generate a new array or input manually\n")
         self.info_text.insert(tk.END, "2. Click 'Build Max Heap' to create heap structure\n")
         self.info_text.insert(tk.END, "3. Click 'Heap Sort' to sort the array\n")
+        self.info_text.insert(tk.END, "Heap tree: scroll to zoom, drag to pan, double-click to fit")
         self.info_text.config(state=tk.DISABLED)
         
         # Status Bar
@@ -157,7 +286,7 @@ class HeapSortVisualizer:
     
     def update_stats(self):
         self.stats_labels['comparisons'].config(text=str(self.comparisons))
-        self.stats_labels['swaps'].config(text=str(self.swaps))
+        self.stats_labels['moves'].config(text=str(self.moves))
         self.stats_labels['size'].config(text=str(len(self.array)))
         self.stats_labels['complexity'].config(text="O(n log n)")
         self.stats_labels['space_complexity'].config(text="O(1)")
@@ -169,13 +298,14 @@ class HeapSortVisualizer:
         self.info_text.config(state=tk.DISABLED)
     
     def generate_new_array(self):
+        self.stop_events()
         self.array_size = self.size_slider.get()
         self.array = [random.randint(10, 100) for _ in range(self.array_size)]
         self.heap_array = self.array.copy()
+        self.heap_size = len(self.heap_array)
         self.comparisons = 0
-        self.swaps = 0
-        self.steps = []
-        self.current_step = 0
+        self.moves = 0
+        self.clear_steps()
         self.is_heapified = False
         
         self.draw_array()
@@ -214,18 +344,19 @@ class HeapSortVisualizer:
                     messagebox.showerror("Error", "Array must have at least 3 elements")
                     return
                 
-                if len(elements) > 20:
-                    messagebox.showerror("Error", "Array cannot exceed 20 elements")
+                if len(elements) > MAX_SIZE:
+                    messagebox.showerror("Error", f"Array cannot exceed {MAX_SIZE} elements")
                     return
                 
+                self.stop_events()
                 self.array = elements
                 self.array_size = len(elements)
                 self.size_slider.set(self.array_size)
                 self.heap_array = self.array.copy()
+                self.heap_size = len(self.heap_array)
                 self.comparisons = 0
-                self.swaps = 0
-                self.steps = []
-                self.current_step = 0
+                self.moves = 0
+                self.clear_steps()
                 self.is_heapified = False
                 
                 self.draw_array()
@@ -251,174 +382,331 @@ class HeapSortVisualizer:
                  padx=20, pady=8).pack(side=tk.LEFT, padx=10)
     
     def draw_array(self, highlight_indices=None, highlight_color=None):
-        self.array_canvas.delete("all")
-        
+        # Full refresh; bars are only created when the size, the canvas or
+        # the value range changes, otherwise they are moved in place
         if not self.array:
+            self.array_canvas.delete("all")
+            self.array_items = []
+            self.array_key = None
             return
         
         canvas_width = self.array_canvas.winfo_width() or 500
         canvas_height = self.array_canvas.winfo_height() or 300
+        key = (len(self.array), canvas_width, canvas_height, max(self.array))
+        if key != self.array_key:
+            self.create_array_items(canvas_width, canvas_height)
+            self.array_key = key
         
+        self.array_highlighted = []
+        self.update_array_bars(highlight_indices or [], highlight_color, range(len(self.array)))
+    
+    def create_array_items(self, canvas_width, canvas_height):
+        canvas = self.array_canvas
+        canvas.delete("all")
         bar_width = (canvas_width - 40) / len(self.array)
-        max_val = max(self.array)
+        self.array_geometry = (bar_width, max(self.array) or 1, canvas_height)
+        # Value and index labels only fit on wide bars
+        labelled = bar_width >= 18
         
-        for i, value in enumerate(self.array):
-            x0 = 20 + i * bar_width
-            y0 = canvas_height - 20 - (value / max_val * (canvas_height - 100))
-            x1 = x0 + bar_width - 2
-            y1 = canvas_height - 20
-            
-            # Determine color
-            color = '#3498db'  # Default blue
-            
-            if highlight_indices and i in highlight_indices:
-                color = highlight_color if highlight_color else '#e74c3c'
-            elif self.is_heapified and i < len(self.heap_array):
-                # Check if element is in sorted position
-                if i >= len(self.array) - self.current_step:
-                    color = '#2ecc71'  # Green for sorted
-            
-            # Draw bar
-            self.array_canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline='white', width=1)
-            
-            # Draw value text
-            self.array_canvas.create_text(x0 + bar_width/2, y0 - 15,
-                                         text=str(value), fill='white',
-                                         font=('Arial', 10, 'bold'))
-            
-            # Draw index
-            self.array_canvas.create_text(x0 + bar_width/2, y1 + 15,
-                                         text=str(i), fill='#bdc3c7',
-                                         font=('Arial', 9))
+        self.array_items = []
+        for i in range(len(self.array)):
+            x = 20 + i * bar_width + bar_width/2
+            rect = canvas.create_rectangle(0, 0, 0, 0, outline='white' if bar_width >= 4 else '',
+                                           width=1)
+            text = None
+            if labelled:
+                text = canvas.create_text(x, 0, fill='white', font=('Arial', 10, 'bold'))
+                canvas.create_text(x, canvas_height - 5, text=str(i), fill='#bdc3c7',
+                                   font=('Arial', 9))
+            self.array_items.append((rect, text))
         
         # Draw title
-        self.array_canvas.create_text(canvas_width/2, 20,
-                                     text="Array Elements",
-                                     fill='white', font=('Arial', 14, 'bold'))
+        canvas.create_text(canvas_width/2, 20, text="Array Elements",
+                           fill='white', font=('Arial', 14, 'bold'))
+    
+    def bar_color(self, i):
+        return '#2ecc71' if i >= self.heap_size else '#3498db'
+    
+    def update_array_bars(self, indices, highlight_color=None, touched=()):
+        # Redraws the bars in `touched`, restores the previous highlights
+        # and highlights `indices`
+        canvas = self.array_canvas
+        bar_width, max_val, canvas_height = self.array_geometry
+        for i in self.array_highlighted:
+            canvas.itemconfig(self.array_items[i][0], fill=self.bar_color(i))
+        for i in touched:
+            rect, text = self.array_items[i]
+            value = self.array[i]
+            x0 = 20 + i * bar_width
+            y0 = canvas_height - 20 - (value / max_val * (canvas_height - 100))
+            canvas.coords(rect, x0, y0, x0 + max(bar_width - 2, 1), canvas_height - 20)
+            canvas.itemconfig(rect, fill=self.bar_color(i))
+            if text is not None:
+                canvas.coords(text, x0 + bar_width/2, y0 - 15)
+                canvas.itemconfig(text, text=str(value))
+        for i in indices:
+            canvas.itemconfig(self.array_items[i][0], fill=highlight_color or '#e74c3c')
+        self.array_highlighted = list(indices)
     
     def draw_heap(self, highlight_nodes=None, highlight_color=None):
-        self.heap_canvas.delete("all")
-        
+        # Full refresh of the visible part of the tree. Canvas items are
+        # only rebuilt when the layout or the view changes; otherwise the
+        # existing items are reconfigured in place.
         if not self.heap_array:
+            self.heap_canvas.delete("all")
+            self.heap_items = {}
+            self.lod_items = {}
+            self.layout_key = self.view_key = None
             return
         
         canvas_width = self.heap_canvas.winfo_width() or 500
         canvas_height = self.heap_canvas.winfo_height() or 300
+        layout = (len(self.heap_array), self.arity, canvas_width)
+        if layout != self.layout_key:
+            self.levels = self.heap_levels()
+            self.fit_heap_view(canvas_width)
+            self.layout_key = layout
+            self.view_key = None
+        view = (self.zoom, self.pan_x, self.pan_y, canvas_height)
+        if view != self.view_key:
+            self.create_heap_items(canvas_width, canvas_height)
+            self.view_key = view
         
-        # Tree drawing parameters
-        level_height = 80
-        node_radius = 25
+        self.highlighted = []
+        self.update_heap_nodes(highlight_nodes or [], highlight_color, self.heap_items)
+        for i in self.lod_items:
+            self.update_lod_bar(i)
         
-        # Calculate tree levels
+        self.heap_canvas.itemconfig(self.heap_props,
+                                    text=f"Max-Heap Property: {self.check_max_heap()}",
+                                    fill='#2ecc71' if self.is_heapified else '#e74c3c')
+    
+    def heap_levels(self):
+        # (first index, node count) of every level for the current size and arity
         n = len(self.heap_array)
-        levels = math.floor(math.log2(n)) + 1
+        levels = []
+        first = 0
+        width = 1
+        while first < n:
+            levels.append((first, min(width, n - first)))
+            first += width
+            width *= self.arity
+        return levels
+    
+    def fit_heap_view(self, canvas_width):
+        # The widest level gets NODE_GAP world pixels per node and every
+        # level is spread evenly over the same width, so partial last
+        # levels stay readable. Zoom is horizontal only: the tree is wide,
+        # not deep, and levels keep a fixed height.
+        self.world_width = max(count for _, count in self.levels) * NODE_GAP
+        self.fit_zoom = canvas_width / self.world_width
+        self.zoom = self.fit_zoom
+        self.pan_x = self.pan_y = 0
+    
+    def create_heap_items(self, canvas_width, canvas_height):
+        # Only the part of the tree inside the viewport gets canvas items.
+        # Levels whose nodes would be closer than MIN_NODE_GAP on screen are
+        # not drawn; each node on the deepest drawn level then gets a bar
+        # standing for its collapsed subtree instead.
+        canvas = self.heap_canvas
+        canvas.delete("all")
+        self.heap_items = {}
+        self.lod_items = {}
         
-        # Draw tree
-        for i, value in enumerate(self.heap_array):
-            level = math.floor(math.log2(i + 1))
-            nodes_in_level = 2 ** level
-            position_in_level = i + 1 - 2 ** level
-            
-            # Calculate position
-            x = (canvas_width / (nodes_in_level + 1)) * (position_in_level + 1)
-            y = 50 + level * level_height
-            
-            # Determine color
-            color = '#3498db'  # Default blue
-            
-            if i == 0:  # Root
-                color = '#1abc9c'
-            
-            if highlight_nodes and i in highlight_nodes:
-                color = highlight_color if highlight_color else '#e74c3c'
-            
-            # Draw connecting lines to children
-            left_child = 2 * i + 1
-            right_child = 2 * i + 2
-            
-            if left_child < len(self.heap_array):
-                child_level = math.floor(math.log2(left_child + 1))
-                child_nodes_in_level = 2 ** child_level
-                child_position_in_level = left_child + 1 - 2 ** child_level
-                
-                child_x = (canvas_width / (child_nodes_in_level + 1)) * (child_position_in_level + 1)
-                child_y = 50 + child_level * level_height
-                
-                self.heap_canvas.create_line(x, y + node_radius, child_x, child_y - node_radius,
-                                            fill='#7f8c8d', width=2)
-            
-            if right_child < len(self.heap_array):
-                child_level = math.floor(math.log2(right_child + 1))
-                child_nodes_in_level = 2 ** child_level
-                child_position_in_level = right_child + 1 - 2 ** child_level
-                
-                child_x = (canvas_width / (child_nodes_in_level + 1)) * (child_position_in_level + 1)
-                child_y = 50 + child_level * level_height
+        rows = []
+        for level, (first, count) in enumerate(self.levels):
+            spacing = self.zoom * self.world_width / (count + 1)
+            if spacing < MIN_NODE_GAP:
+                break
+            y = self.pan_y + 50 + level * LEVEL_HEIGHT
+            rows.append((first, count, spacing, y, min(NODE_RADIUS, spacing * 0.4)))
+        self.lod_level = len(rows) - 1
+        collapsed = len(rows) < len(self.levels)
+        
+        # Edges first so the nodes are drawn on top of them
+        for (_, count, spacing, y, r), (_, child_count, child_spacing, child_y, child_r) in zip(rows, rows[1:]):
+            if child_y < 0 or y > canvas_height:
+                continue
+            lo, hi = self.edge_parents(count, spacing, child_count, child_spacing, canvas_width)
+            for p in range(lo, hi + 1):
+                x = self.pan_x + spacing * (p + 1)
+                for q in range(self.arity * p, min(self.arity * p + self.arity, child_count)):
+                    child_x = self.pan_x + child_spacing * (q + 1)
+                    if max(x, child_x) < 0 or min(x, child_x) > canvas_width:
+                        continue
+                    canvas.create_line(x, y + r, child_x, child_y - child_r,
+                                       fill='#7f8c8d', width=2 if r >= 10 else 1)
+        
+        for level, (first, count, spacing, y, r) in enumerate(rows):
+            if y < -LEVEL_HEIGHT or y > canvas_height + LEVEL_HEIGHT:
+                continue
+            lo = max(0, math.ceil((-r - self.pan_x) / spacing - 1))
+            hi = min(count - 1, math.floor((canvas_width + r - self.pan_x) / spacing - 1))
+            if collapsed and level == self.lod_level:
+                largest = self.subtree_counts(first)[0]
+            for pos in range(lo, hi + 1):
+                i = first + pos
+                x = self.pan_x + spacing * (pos + 1)
+                oval = canvas.create_oval(x - r, y - r, x + r, y + r,
+                                          outline='white', width=2 if r >= 10 else 1)
+                label = None
+                if r >= 10:
+                    label = canvas.create_text(x, y, fill='white', font=('Arial', 10, 'bold'))
+                if r >= NODE_RADIUS - 5:
+                    canvas.create_text(x, y + r + 10, text=f"i={i}",
+                                       fill='#bdc3c7', font=('Arial', 8))
+                self.heap_items[i] = (oval, label)
                 
-                self.heap_canvas.create_line(x, y + node_radius, child_x, child_y - node_radius,
-                                            fill='#7f8c8d', width=2)
-            
-            # Draw node circle
-            self.heap_canvas.create_oval(x - node_radius, y - node_radius,
-                                        x + node_radius, y + node_radius,
-                                        fill=color, outline='white', width=2)
-            
-            # Draw value
-            self.heap_canvas.create_text(x, y, text=str(value),
-                                        fill='white', font=('Arial', 10, 'bold'))
-            
-            # Draw index
-            self.heap_canvas.create_text(x, y + node_radius + 10, text=f"i={i}",
-                                        fill='#bdc3c7', font=('Arial', 8))
+                if collapsed and level == self.lod_level and self.arity * i + 1 < len(self.heap_array):
+                    # Bar height is the subtree size relative to the largest
+                    # one on this level; the green part is already sorted
+                    half = spacing * 0.3
+                    top = y + r + 22
+                    height = LOD_BAR_HEIGHT * self.subtree_counts(i)[0] / largest
+                    canvas.create_line(x, y + r, x, top, fill='#7f8c8d')
+                    canvas.create_rectangle(x - half, top, x + half, top + height,
+                                            fill='#34495e', outline='#7f8c8d')
+                    done = canvas.create_rectangle(x - half, top + height, x + half, top + height,
+                                                   fill='#2ecc71', width=0)
+                    self.lod_items[i] = (done, x - half, x + half, top + height, height)
         
         # Draw title
-        self.heap_canvas.create_text(canvas_width/2, 20,
-                                    text="Heap Tree Structure",
-                                    fill='white', font=('Arial', 14, 'bold'))
-        
-        # Draw heap properties
-        props_y = 50 + levels * level_height + 20
-        props_text = f"Max-Heap Property: {self.check_max_heap()}"
-        self.heap_canvas.create_text(canvas_width/2, props_y,
-                                    text=props_text,
-                                    fill='#2ecc71' if self.is_heapified else '#e74c3c',
-                                    font=('Arial', 10, 'bold'))
+        canvas.create_text(canvas_width/2, 20, text="Heap Tree Structure",
+                           fill='white', font=('Arial', 14, 'bold'))
+        
+        # Heap properties, filled in by draw_heap
+        props_y = self.pan_y + 50 + len(rows) * LEVEL_HEIGHT + 20
+        if collapsed:
+            props_y += LOD_BAR_HEIGHT
+        self.heap_props = canvas.create_text(canvas_width/2, props_y, font=('Arial', 10, 'bold'))
+        
+        view = f"{len(self.heap_items)} of {len(self.heap_array)} nodes drawn"
+        if collapsed:
+            view += f", levels {len(rows)}+ collapsed"
+        canvas.create_text(10, canvas_height - 10, text=view, anchor=tk.W,
+                           fill='#bdc3c7', font=('Arial', 8))
     
-    def check_max_heap(self):
+    def edge_parents(self, count, spacing, child_count, child_spacing, canvas_width):
+        # Level positions of the parents with an edge inside the visible x
+        # range. Parent and child x both grow with the position, so this is
+        # one contiguous range and it is found without scanning the level.
+        a = self.arity
+        left = -self.pan_x
+        right = canvas_width - self.pan_x
+        lo = min(math.ceil(left / spacing - 1), math.ceil((left / child_spacing - a) / a))
+        hi = max(math.floor(right / spacing - 1), math.floor((right / child_spacing - 1) / a))
+        return max(lo, 0), min(hi, count - 1, (child_count - 1) // a)
+    
+    def subtree_counts(self, i):
+        # (descendants, descendants already in their sorted position) of node i
         n = len(self.heap_array)
-        for i in range(n):
-            left = 2 * i + 1
-            right = 2 * i + 2
-            
-            if left < n and self.heap_array[i] < self.heap_array[left]:
-                return False
-            if right < n and self.heap_array[i] < self.heap_array[right]:
-                return False
-        return True
+        size = done = 0
+        lo = hi = i
+        while True:
+            lo = self.arity * lo + 1
+            hi = self.arity * hi + self.arity
+            if lo >= n:
+                break
+            last = min(hi, n - 1)
+            size += last - lo + 1
+            done += max(0, last - max(lo, self.heap_size) + 1)
+        return size, done
+    
+    def update_lod_bar(self, i):
+        done, x0, x1, bottom, height = self.lod_items[i]
+        size, sorted_count = self.subtree_counts(i)
+        self.heap_canvas.coords(done, x0, bottom - height * sorted_count / size, x1, bottom)
+    
+    def collapsed_ancestor(self, i):
+        # The node on the deepest drawn level whose bar stands for node i
+        level = 0
+        while level + 1 < len(self.levels) and i >= self.levels[level + 1][0]:
+            level += 1
+        while level > self.lod_level:
+            i = (i - 1) // self.arity
+            level -= 1
+        return i
+    
+    def zoom_heap(self, x, factor):
+        zoom = min(max(self.zoom * factor, self.fit_zoom), max(self.fit_zoom, MAX_ZOOM))
+        # Keep the point under the cursor in place
+        self.pan_x = x - (x - self.pan_x) * zoom / self.zoom
+        self.zoom = zoom
+        self.clamp_pan()
+        self.draw_heap()
+    
+    def start_pan(self, event):
+        self.drag_start = (event.x, event.y, self.pan_x, self.pan_y)
+    
+    def pan_heap(self, event):
+        x, y, pan_x, pan_y = self.drag_start
+        self.pan_x = pan_x + event.x - x
+        self.pan_y = pan_y + event.y - y
+        self.clamp_pan()
+        self.draw_heap()
+    
+    def fit_heap(self):
+        self.layout_key = None
+        self.draw_heap()
+    
+    def clamp_pan(self):
+        canvas_width = self.heap_canvas.winfo_width() or 500
+        self.pan_x = min(0, max(self.pan_x, canvas_width - self.world_width * self.zoom))
+        self.pan_y = min(0, max(self.pan_y, -(len(self.levels) - 1) * LEVEL_HEIGHT))
+    
+    def node_color(self, i):
+        if i >= self.heap_size:
+            return '#2ecc71'  # Sorted, no longer part of the heap
+        if i == 0:
+            return '#1abc9c'  # Root
+        return '#3498db'
+    
+    def update_heap_nodes(self, indices, highlight_color=None, touched=()):
+        # Per-event redraw: restores the nodes highlighted by the previous
+        # event, refreshes the ones in `touched` and highlights `indices`.
+        # Nodes outside the viewport have no items and are skipped.
+        canvas = self.heap_canvas
+        items = self.heap_items
+        for i in self.highlighted:
+            if i in items:
+                canvas.itemconfig(items[i][0], fill=self.node_color(i))
+        for i in touched:
+            if i in items:
+                oval, label = items[i]
+                canvas.itemconfig(oval, fill=self.node_color(i))
+                if label is not None:
+                    canvas.itemconfig(label, text=str(self.heap_array[i]))
+            elif self.lod_items:
+                ancestor = self.collapsed_ancestor(i)
+                if ancestor in self.lod_items:
+                    self.update_lod_bar(ancestor)
+        for i in indices:
+            if i in items:
+                canvas.itemconfig(items[i][0], fill=highlight_color or '#e74c3c')
+        self.highlighted = list(indices)
+    
+    def check_max_heap(self):
+        # Only the active heap counts; the sorted tail is outside it
+        return heap_engine.is_heap(self.heap_array, self.heap_size, self.arity)
     
     def build_max_heap(self):
         if not self.array:
             messagebox.showwarning("Warning", "Please generate an array first")
             return
+        if self.events is not None:
+            self.status_bar.config(text="Wait for the running operation to finish")
+            return
         
+        self.end_replay()
         self.heap_array = self.array.copy()
-        self.steps = []
-        self.current_step = 0
+        self.heap_size = len(self.heap_array)
+        self.clear_steps()
         self.comparisons = 0
-        self.swaps = 0
-        
-        thread = Thread(target=self._build_max_heap)
-        thread.daemon = True
-        thread.start()
+        self.moves = 0
+        self.status_bar.config(text="Building Max Heap...")
+        self.run_events(heap_engine.build_heap(self.heap_array, arity=self.arity), self.finish_build)
     
-    def _build_max_heap(self):
-        n = len(self.heap_array)
-        
-        # Build max heap
-        for i in range(n // 2 - 1, -1, -1):
-            self.heapify(n, i)
-            self.root.after(self.speed_slider.get() * 10)
-        
+    def finish_build(self):
         self.is_heapified = True
         self.update_info("Max Heap built successfully!\nParent nodes are always greater than or equal to child nodes.")
         self.status_bar.config(text="Max Heap construction completed")
@@ -426,145 +714,393 @@ class HeapSortVisualizer:
         self.draw_heap()
         self.update_stats()
     
-    def heapify(self, n, i):
-        largest = i
-        left = 2 * i + 1
-        right = 2 * i + 2
-        
-        # Highlight comparison
-        self.comparisons += 1
+    def run_events(self, events, on_done):
+        # The engine mutates self.heap_array as it is advanced, and it is
+        # only advanced from this Tk callback, so the display always shows
+        # the state right after the event being drawn. No threads, no sleep.
+        self.events = events
+        self.on_done = on_done
+        # The property is rechecked by the full redraw at the end
+        if self.heap_items:
+            self.heap_canvas.itemconfig(self.heap_props, text="Max-Heap Property: ...",
+                                        fill='#bdc3c7')
+        self.event_tick()
+    
+    def event_tick(self):
+        if self.events is None:
+            return
+        # Big heaps apply a batch of events per tick and draw once
+        batch = max(1, len(self.heap_array) // BATCH_SIZE)
+        touched = set()
+        shown = None
+        for event in self.events:
+            op = event[0]
+            if op == COMPARE or op == WRITE or op == BOUNDARY:
+                shown = self.apply_event(event)
+                touched.update(shown[0])
+                batch -= 1
+                if batch == 0:
+                    break
+        else:
+            self.events = None
+        if shown:
+            self.show_event(*shown, touched)
+        if self.events is None:
+            self.on_done()
+            return
+        self.after_id = self.root.after(self.speed_slider.get(), self.event_tick)
+    
+    def stop_events(self):
+        if self.events is not None:
+            self.events = None
+            self.root.after_cancel(self.after_id)
+    
+    def apply_event(self, event):
+        # Updates the counters and the displayed state; returns what to show
+        op, a, b = event
+        heap = self.heap_array
+        if op == COMPARE:
+            self.record_step(COMPARE, a, b)
+            self.comparisons += 1
+            return [a, b], '#f39c12', f"Comparing index {a} (value {heap[a]}) with index {b} (value {heap[b]})"
+        if op == WRITE:
+            self.record_step(WRITE, a, b, self.array[a])
+            self.moves += 1
+            self.array[a] = b
+            return [a], '#e74c3c', f"Moving {b} into index {a}"
+        if len(heap) != len(self.array):
+            # A priority-queue operation grew or shrank the heap
+            changed = heap[-1] if len(heap) > len(self.array) else self.array[-1]
+            self.record_step(RESIZE, a, len(self.array), changed)
+            self.heap_size = a
+            self.array = list(heap)
+            self.resized = True
+            return [], '#9b59b6', f"Queue now holds {a} items"
+        self.record_step(BOUNDARY, a, self.heap_size)
+        self.heap_size = a
+        return [a], '#2ecc71', f"Heap shrinks to {a} elements\nElement {heap[a]} is now in its sorted position"
+    
+    def show_event(self, indices, color, message, touched=()):
+        self.update_info(message)
+        self.status_bar.config(text=message.split("\n")[0])
+        if self.resized:
+            # The layout changed, so everything is redrawn once
+            self.resized = False
+            self.draw_array(highlight_indices=indices, highlight_color=color)
+            self.draw_heap(highlight_nodes=indices, highlight_color=color)
+        else:
+            self.update_array_bars(indices, color, touched)
+            self.update_heap_nodes(indices, color, touched)
         self.update_stats()
-        
-        self.draw_array(highlight_indices=[i, left if left < n else None, right if right < n else None],
-                       highlight_color='#f39c12')
-        self.draw_heap(highlight_nodes=[i, left if left < n else None, right if right < n else None],
-                      highlight_color='#f39c12')
-        self.update_info(f"Heapifying node {i} (value: {self.heap_array[i]})\n"
-                        f"Comparing with children...")
-        self.status_bar.config(text=f"Heapifying node {i}")
-        time.sleep(self.speed_slider.get() / 1000)
-        
-        if left < n and self.heap_array[left] > self.heap_array[largest]:
-            largest = left
-        
-        if right < n and self.heap_array[right] > self.heap_array[largest]:
-            largest = right
-        
-        if largest != i:
-            # Highlight swap
-            self.swaps += 1
-            self.update_stats()
-            
-            self.draw_array(highlight_indices=[i, largest], highlight_color='#e74c3c')
-            self.draw_heap(highlight_nodes=[i, largest], highlight_color='#e74c3c')
-            self.update_info(f"Swapping {self.heap_array[i]} (index {i}) with "
-                           f"{self.heap_array[largest]} (index {largest})")
-            self.status_bar.config(text=f"Swapping elements {i} and {largest}")
-            time.sleep(self.speed_slider.get() / 1000)
-            
-            # Perform swap
-            self.heap_array[i], self.heap_array[largest] = self.heap_array[largest], self.heap_array[i]
-            
-            # Update array to match heap
-            if i < len(self.array):
-                self.array[i] = self.heap_array[i]
-            if largest < len(self.array):
-                self.array[largest] = self.heap_array[largest]
-            
-            # Recursively heapify the affected sub-tree
-            self.heapify(n, largest)
-        
-        # Show heapified node
-        self.draw_array(highlight_indices=[i], highlight_color='#9b59b6')
-        self.draw_heap(highlight_nodes=[i], highlight_color='#9b59b6')
-        self.update_info(f"Node {i} heapified")
-        time.sleep(self.speed_slider.get() / 500)
+    
+    def set_arity(self, arity):
+        if self.events is not None:
+            self.arity_var.set(self.arity)
+            self.status_bar.config(text="Wait for the running operation to finish")
+            return
+        # A heap of one arity is generally not a heap of another
+        self.arity = int(arity)
+        self.is_heapified = False
+        self.clear_steps()
+        self.heap_array = self.array.copy()
+        self.heap_size = len(self.heap_array)
+        self.draw_array()
+        self.draw_heap()
+        self.update_info(f"Using a {self.arity}-ary heap: node i has children "
+                         f"{self.arity}i+1 .. {self.arity}i+{self.arity}")
     
     def start_heap_sort(self):
+        if self.events is not None:
+            self.status_bar.config(text="Wait for the running operation to finish")
+            return
+        if not self.array:
+            messagebox.showwarning("Warning", "Please generate an array first")
+            return
+        
+        self.end_replay()
+        self.comparisons = 0
+        self.moves = 0
+        self.clear_steps()
+        mode = self.mode_var.get()
+        self.queue = None  # sorting takes the heap apart
+        self.compare_modes()
+        if self.is_heapified:
+            events = heap_engine.sort_down(self.heap_array, arity=self.arity, mode=mode)
+        else:
+            # Build and sort in one run instead of waiting on a timer
+            self.heap_array = self.array.copy()
+            events = heap_engine.heap_sort(self.heap_array, self.arity, mode)
+        self.heap_size = len(self.heap_array)
+        self.status_bar.config(text="Sorting...")
+        self.run_events(events, self.finish_heap_sort)
+    
+    def compare_modes(self):
+        # Counts a complete headless heap sort of the same input per mode
+        for mode in heap_engine.MODES:
+            stats = SortStats()
+            stats.consume(heap_engine.heap_sort(self.array.copy(), self.arity, mode))
+            self.stats_labels[mode].config(text=f"{stats.comparisons} comparisons, "
+                                                f"{stats.writes} moves")
+    
+    def ready_queue(self):
+        # The queue wraps the current max heap; None if there is none yet
+        if self.events is not None:
+            self.status_bar.config(text="Wait for the running operation to finish")
+            return None
+        if self.arity != 2:
+            messagebox.showinfo("Info", "The priority queue is a binary heap. Set the arity to 2.")
+            return None
         if not self.is_heapified:
-            messagebox.showinfo("Info", "Building Max Heap first...")
-            self.build_max_heap()
-            # Wait a bit for heap to build
-            self.root.after(1000, self._start_heap_sort_delayed)
+            messagebox.showinfo("Info", "Build the max heap first.")
+            return None
+        self.end_replay()
+        if self.queue is None or self.queue.priorities is not self.heap_array:
+            # heap_array is already a heap, so heapify moves nothing
+            self.queue = priority_queue.IndexedHeap(enumerate(self.heap_array))
+            self.next_item = len(self.heap_array)
+            self.heap_array = self.queue.priorities
+        return self.queue
+    
+    def read_entry(self, entry, default):
+        # The entry's integer, `default` if it is empty, None if it is invalid
+        text = entry.get().strip()
+        if not text:
+            return default
+        try:
+            return int(text)
+        except ValueError:
+            messagebox.showerror("Error", f"Please enter an integer, not {text!r}")
+            return None
+    
+    def read_index(self, queue):
+        if not len(queue):
+            messagebox.showinfo("Info", "The queue is empty")
+            return None
+        index = self.read_entry(self.index_entry, random.randrange(len(queue)))
+        if index is not None and not 0 <= index < len(queue):
+            messagebox.showerror("Error", f"Index must be between 0 and {len(queue) - 1}")
+            return None
+        return index
+    
+    def queue_push(self):
+        queue = self.ready_queue()
+        if queue is None:
+            return
+        value = self.read_entry(self.value_entry, random.randint(10, 100))
+        if value is None:
+            return
+        self.next_item += 1
+        self.run_queue_op(queue.push_events(self.next_item, value), lambda _: f"Pushed {value}")
+    
+    def queue_pop(self):
+        queue = self.ready_queue()
+        if queue is None:
+            return
+        if not len(queue):
+            messagebox.showinfo("Info", "The queue is empty")
+            return
+        self.run_queue_op(queue.pop_events(), lambda top: f"Popped the maximum, {top[1]}")
+    
+    def queue_change(self, increase):
+        queue = self.ready_queue()
+        if queue is None:
+            return
+        index = self.read_index(queue)
+        if index is None:
+            return
+        current = self.heap_array[index]
+        step = random.randint(1, 30)
+        value = self.read_entry(self.value_entry, current + step if increase else current - step)
+        if value is None:
+            return
+        item = queue.item_at(index)
+        if increase:
+            if value < current:
+                messagebox.showerror("Error", f"Increase Key needs a value of at least {current}")
+                return
+            events = queue.increase_key_events(item, value)
         else:
-            self._start_heap_sort()
+            if value > current:
+                messagebox.showerror("Error", f"Decrease Key needs a value of at most {current}")
+                return
+            events = queue.decrease_key_events(item, value)
+        self.run_queue_op(events, lambda _: f"Changed index {index} from {current} to {value}")
     
-    def _start_heap_sort_delayed(self):
-        self._start_heap_sort()
+    def queue_remove(self):
+        queue = self.ready_queue()
+        if queue is None:
+            return
+        index = self.read_index(queue)
+        if index is None:
+            return
+        self.run_queue_op(queue.remove_events(queue.item_at(index)),
+                          lambda removed: f"Removed {removed} from index {index}")
     
-    def _start_heap_sort(self):
-        self.comparisons = 0
-        self.swaps = 0
-        self.steps = []
-        self.current_step = 0
+    def run_queue_op(self, events, describe):
+        def run():
+            result = yield from events
+            self.queue_message = describe(result)
         
-        thread = Thread(target=self._perform_heap_sort)
-        thread.daemon = True
-        thread.start()
+        self.comparisons = 0
+        self.moves = 0
+        self.clear_steps()
+        self.status_bar.config(text="Running priority-queue operation...")
+        self.run_events(run(), self.finish_queue_op)
     
-    def _perform_heap_sort(self):
-        n = len(self.heap_array)
-        
-        # Extract elements from heap one by one
-        for i in range(n - 1, 0, -1):
-            # Move current root to end
-            self.swaps += 1
-            self.update_stats()
-            
-            # Highlight swap
-            self.draw_array(highlight_indices=[0, i], highlight_color='#e74c3c')
-            self.draw_heap(highlight_nodes=[0, i], highlight_color='#e74c3c')
-            self.update_info(f"Moving root ({self.heap_array[0]}) to sorted position {i}")
-            self.status_bar.config(text=f"Swapping root with element {i}")
-            time.sleep(self.speed_slider.get() / 500)
-            
-            # Perform swap
-            self.heap_array[0], self.heap_array[i] = self.heap_array[i], self.heap_array[0]
-            
-            # Update array
-            self.array[0] = self.heap_array[0]
-            self.array[i] = self.heap_array[i]
-            
-            # Mark sorted element
-            self.array[i] = self.heap_array[i]
-            self.draw_array(highlight_indices=[i], highlight_color='#2ecc71')
-            self.update_info(f"Element {self.heap_array[i]} now in sorted position {i}")
-            time.sleep(self.speed_slider.get() / 500)
-            
-            # Call max heapify on the reduced heap
-            self.heapify(i, 0)
-        
-        # Mark first element as sorted
-        self.draw_array(highlight_indices=[0], highlight_color='#2ecc71')
+    def finish_queue_op(self):
+        self.array = list(self.heap_array)
+        self.heap_size = len(self.heap_array)
+        self.draw_array()
+        self.draw_heap()
+        self.update_stats()
+        self.update_info(f"{self.queue_message}\nThe queue holds {len(self.heap_array)} items; "
+                         f"{self.comparisons} comparisons, {self.moves} moves")
+        self.status_bar.config(text=self.queue_message)
+    
+    def finish_heap_sort(self):
+        self.is_heapified = False
+        self.heap_size = 0
+        self.array = self.heap_array.copy()
+        self.draw_array()
+        self.draw_heap()
         self.update_info("Heap Sort completed!\nArray is now fully sorted.")
         self.status_bar.config(text="Heap Sort completed - Array is sorted")
-        
-        # Final visualization
-        for i in range(len(self.array)):
-            self.draw_array(highlight_indices=list(range(i+1)), highlight_color='#2ecc71')
-            time.sleep(self.speed_slider.get() / 1000)
-        
         self.update_stats()
     
+    def clear_steps(self):
+        self.steps = array('q')
+        self.current_step = 0
+    
+    def record_step(self, op, a, b, old=0):
+        self.steps.extend((op, a, b, old))
+        self.current_step += 1
+    
+    def step_count(self):
+        return len(self.steps) // STEP_FIELDS
+    
+    def step_record(self, k):
+        i = k * STEP_FIELDS
+        return tuple(self.steps[i:i + STEP_FIELDS])
+    
     def next_step(self):
+        if not self.ready_to_step():
+            return
+        if self.current_step >= self.step_count():
+            messagebox.showinfo("Info", "All steps completed")
+            return
+        op, a, b, old = self.step_record(self.current_step)
+        self.current_step += 1
+        self.heap_size = redo_step(self.array, self.heap_size, op, a, b, old)
+        redo_step(self.heap_array, 0, op, a, b, old)
+        if op == COMPARE:
+            self.comparisons += 1
+            indices, color, message = [a, b], '#f39c12', f"Compare index {a} with index {b}"
+        elif op == WRITE:
+            self.moves += 1
+            indices, color, message = [a], '#e74c3c', f"Index {a}: {old} -> {b}"
+        else:
+            indices, color, message = self.size_step(op, b, a)
+        self.show_step(indices, color, message)
+    
+    def prev_step(self):
+        if not self.ready_to_step():
+            return
+        if self.current_step <= 0:
+            messagebox.showinfo("Info", "Already at the first step")
+            return
+        self.current_step -= 1
+        op, a, b, old = self.step_record(self.current_step)
+        self.heap_size = undo_step(self.array, self.heap_size, op, a, b, old)
+        undo_step(self.heap_array, 0, op, a, b, old)
+        if op == COMPARE:
+            self.comparisons -= 1
+            indices, color, message = [a, b], '#f39c12', f"Undo compare of index {a} with index {b}"
+        elif op == WRITE:
+            self.moves -= 1
+            indices, color, message = [a], '#e74c3c', f"Index {a}: {b} -> {old}"
+        else:
+            indices, color, message = self.size_step(op, a, b)
+        self.show_step(indices, color, message)
+    
+    def size_step(self, op, old_size, new_size):
+        if op == RESIZE:
+            self.resized = True
+            return [], '#9b59b6', f"Queue size {old_size} -> {new_size}"
+        return [min(old_size, new_size)], '#2ecc71', f"Heap size {old_size} -> {new_size}"
+    
+    def ready_to_step(self):
+        if self.events is not None:
+            self.status_bar.config(text="Wait for the running operation to finish")
+            return False
         if not self.steps:
             messagebox.showinfo("Info", "No steps recorded. Run an operation first.")
+            return False
+        return True
+    
+    def show_step(self, indices, color, message):
+        message = f"Step {self.current_step} of {self.step_count()}: {message}"
+        self.show_event(indices, color, message, indices)
+    
+    def end_replay(self):
+        # Operations continue from the end of the log, so a rewound display
+        # is brought forward first
+        if self.current_step == self.step_count():
             return
-        
-        if self.current_step < len(self.steps):
-            step = self.steps[self.current_step]
-            # Execute step visualization
+        while self.current_step < self.step_count():
+            op, a, b, old = self.step_record(self.current_step)
             self.current_step += 1
-        else:
-            messagebox.showinfo("Info", "All steps completed")
+            self.heap_size = redo_step(self.array, self.heap_size, op, a, b, old)
+            redo_step(self.heap_array, 0, op, a, b, old)
+            if op == COMPARE:
+                self.comparisons += 1
+            elif op == WRITE:
+                self.moves += 1
+        self.draw_array()
+        self.draw_heap()
+        self.update_stats()
+    
+    def export_steps(self):
+        if not self.ready_to_step():
+            return
+        path = filedialog.asksaveasfilename(title="Export step log", defaultextension=".trace",
+                                            filetypes=[("Sort traces", "*.trace"), ("JSON", "*.json")])
+        if not path:
+            return
+        
+        # Rewind a copy of the display to the state before the first step
+        initial = list(self.array)
+        heap_size = self.heap_size
+        for k in range(self.current_step - 1, -1, -1):
+            heap_size = undo_step(initial, heap_size, *self.step_record(k))
+        records = [self.step_record(k) for k in range(self.step_count())]
+        
+        try:
+            if path.endswith(".json"):
+                with open(path, 'w') as f:
+                    json.dump({"arity": self.arity, "initial": initial, "heap_size": heap_size,
+                               "fields": ["op", "a", "b", "old"], "steps": records}, f)
+            elif any(record[0] == RESIZE for record in records):
+                messagebox.showerror("Error", "Traces have a fixed array length; export runs "
+                                              "that resize the queue as JSON")
+                return
+            else:
+                # The sort trace format, so the run opens in the replay viewer
+                with TraceRecorder(path, initial) as recorder:
+                    for op, a, b, _ in records:
+                        recorder.record((op, a, b))
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not export steps:\n\n{e}")
+            return
+        self.status_bar.config(text=f"Exported {len(records)} steps to {path}")
     
     def reset_visualization(self):
+        self.stop_events()
         self.array = [random.randint(10, 100) for _ in range(self.array_size)]
         self.heap_array = self.array.copy()
+        self.heap_size = len(self.heap_array)
         self.comparisons = 0
-        self.swaps = 0
-        self.steps = []
-        self.current_step = 0
+        self.moves = 0
+        self.clear_steps()
         self.is_heapified = False
         
         self.draw_array()
@@ -1,20 +1,41 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import random
 import time
+from array import array
 from threading import Thread
+import sorting_engine
+from sort_rendering import BarRenderer, ColumnRenderer, RenderScheduler
+from sort_trace import TracePlayer, TraceRecorder
+from sort_race import SortRace
+from presortedness import recommend
+from sorting_networks import NETWORKS, network_layers
+import order_statistics
 
 class LinearSortingVisualizer:
     def __init__(self, root):
         self.root = root
         self.root.title("Linear Sorting Algorithms Visualizer")
-        self.root.geometry("1000x700")
+        self.root.geometry("1000x850")
         self.root.configure(bg='#2c3e50')
         
         self.array = []
+        self.highlight = ()
         self.speed = 50
         self.array_size = 30
+        self.large = False
+        self.stats = None
+        self.player = None
+        self.replay_playing = False
+        self.sorting = False
+        self.race = None
+        self.race_renderers = []
+        self.auto_note = None
+        self.network_dialog = None
         self.create_widgets()
+        self.scheduler = RenderScheduler(self.root, self.apply_event, self.repaint,
+                                         fps=self.fps_slider.get(), max_pending=256)
+        self.scheduler.start()
         self.generate_new_array()
     
     def create_widgets(self):
@@ -40,6 +61,36 @@ class LinearSortingVisualizer:
         self.speed_slider.set(50)
         self.speed_slider.grid(row=0, column=3, padx=5)
         
+        tk.Label(control_frame, text="FPS Cap:", bg='#34495e', fg='white').grid(row=0, column=4, padx=5)
+        self.fps_slider = tk.Scale(control_frame, from_=10, to=120, orient=tk.HORIZONTAL,
+                                  bg='#34495e', fg='white', highlightthickness=0)
+        self.fps_slider.set(60)
+        self.fps_slider.grid(row=0, column=5, padx=5)
+        
+        # Large-array mode: compact int buffer rendered as pixel columns
+        self.large_mode = tk.BooleanVar(value=False)
+        tk.Checkbutton(control_frame, text="Large Array Mode", variable=self.large_mode,
+                      command=self.generate_new_array, bg='#34495e', fg='white',
+                      selectcolor='#2c3e50', activebackground='#34495e').grid(row=0, column=6, padx=5)
+        self.large_size = tk.StringVar(value="100000")
+        tk.OptionMenu(control_frame, self.large_size, "100000", "250000", "500000", "1000000",
+                     command=lambda _: self.generate_new_array()).grid(row=0, column=7, padx=5)
+        
+        # Counting is optional so timing runs are not slowed down by it
+        self.count_ops = tk.BooleanVar(value=True)
+        tk.Checkbutton(control_frame, text="Count Operations", variable=self.count_ops,
+                      bg='#34495e', fg='white', selectcolor='#2c3e50',
+                      activebackground='#34495e').grid(row=0, column=8, padx=5)
+        
+        self.record_trace = tk.BooleanVar(value=False)
+        tk.Checkbutton(control_frame, text="Record Trace", variable=self.record_trace,
+                      bg='#34495e', fg='white', selectcolor='#2c3e50',
+                      activebackground='#34495e').grid(row=0, column=9, padx=5)
+        
+        tk.Label(control_frame, text="Race By:", bg='#34495e', fg='white').grid(row=0, column=10, padx=5)
+        self.race_mode = tk.StringVar(value="ops")
+        tk.OptionMenu(control_frame, self.race_mode, "ops", "time").grid(row=0, column=11, padx=5)
+        
         # Buttons
         button_frame = tk.Frame(self.root, bg='#2c3e50')
         button_frame.pack(pady=10)
@@ -50,24 +101,71 @@ class LinearSortingVisualizer:
             ("Selection Sort", lambda: self.start_sorting("selection")),
             ("Insertion Sort", lambda: self.start_sorting("insertion")),
             ("Quick Sort", lambda: self.start_sorting("quick")),
-            ("Merge Sort", lambda: self.start_sorting("merge"))
+            ("Introsort", lambda: self.start_sorting("intro")),
+            ("Merge Sort", lambda: self.start_sorting("merge")),
+            ("Counting Sort", lambda: self.start_sorting("counting")),
+            ("Radix Sort (LSD)", lambda: self.start_sorting("radix_lsd")),
+            ("Radix Sort (MSD)", lambda: self.start_sorting("radix_msd")),
+            ("Bucket Sort", lambda: self.start_sorting("bucket")),
+            ("Auto", lambda: self.start_sorting(sorting_engine.AUTO)),
+            ("Median", lambda: self.start_selection("nth")),
+            ("Smallest 10", lambda: self.start_selection("partial")),
+            ("Quartiles", lambda: self.start_selection("multi")),
+            ("Race All", self.start_race),
+            ("Replay Trace", self.open_replay),
+            ("Sorting Network", self.open_network_view)
         ]
         
-        for text, command in buttons:
+        for i, (text, command) in enumerate(buttons):
             btn = tk.Button(button_frame, text=text, command=command,
                           bg='#3498db', fg='white', font=('Arial', 10, 'bold'),
                           padx=20, pady=10, relief=tk.RAISED, borderwidth=3)
+            btn.grid(row=i // 6, column=i % 6, padx=5, pady=3, sticky="ew")
+        
+        # Replay controls (enabled once a trace is opened)
+        replay_frame = tk.Frame(self.root, bg='#34495e')
+        replay_frame.pack(pady=5)
+        
+        self.replay_buttons = []
+        for text, command in [("◀ Step", self.replay_step_back),
+                              ("▶ Play / Pause", self.replay_toggle),
+                              ("Step ▶", self.replay_step_forward)]:
+            btn = tk.Button(replay_frame, text=text, command=command, state=tk.DISABLED,
+                          bg='#9b59b6', fg='white', font=('Arial', 9, 'bold'), padx=10)
             btn.pack(side=tk.LEFT, padx=5)
+            self.replay_buttons.append(btn)
+        
+        self.replay_slider = tk.Scale(replay_frame, from_=0, to=0, orient=tk.HORIZONTAL,
+                                     length=350, label="Step", command=self.replay_seek,
+                                     bg='#34495e', fg='white', highlightthickness=0)
+        self.replay_slider.pack(side=tk.LEFT, padx=5)
+        
+        self.replay_rate = tk.Scale(replay_frame, from_=1, to=5000, orient=tk.HORIZONTAL,
+                                   length=150, label="Steps / Frame",
+                                   bg='#34495e', fg='white', highlightthickness=0)
+        self.replay_rate.set(10)
+        self.replay_rate.pack(side=tk.LEFT, padx=5)
         
         # Canvas for visualization
         self.canvas = tk.Canvas(self.root, width=950, height=400, bg='#1a1a2e')
         self.canvas.pack(pady=20)
+        self.bar_renderer = BarRenderer(self.canvas, 950, 400)
+        self.column_renderer = ColumnRenderer(self.canvas, 950, 400)
+        self.renderer = self.bar_renderer
         
         # Status bar
         self.status_label = tk.Label(self.root, text="Ready", bg='#2c3e50', 
-                                    fg='#bdc3c7', font=('Arial', 12))
+                                    fg='#bdc3c7', font=('Arial', 12), wraplength=900)
         self.status_label.pack(pady=10)
         
+        self.fps_label = tk.Label(self.root, text="0 fps", bg='#2c3e50',
+                                 fg='#7f8c8d', font=('Arial', 10))
+        self.fps_label.pack()
+        
+        self.stats_label = tk.Label(self.root, text="", bg='#2c3e50',
+                                   fg='#ecf0f1', font=('Arial', 10))
+        self.stats_label.pack()
+        
         # Time complexity info
         info_frame = tk.Frame(self.root, bg='#34495e')
         info_frame.pack(pady=10)
@@ -77,169 +175,506 @@ class LinearSortingVisualizer:
             "Selection Sort: O(n²)", 
             "Insertion Sort: O(n²)",
             "Quick Sort: O(n log n)",
-            "Merge Sort: O(n log n)"
+            "Introsort: O(n log n) worst",
+            "Merge Sort: O(n log n)",
+            "Counting Sort: O(n + k)",
+            "Radix Sort: O(d(n + b))",
+            "Bucket Sort: O(n) avg"
         ]
         
         for i, text in enumerate(complexities):
             tk.Label(info_frame, text=text, bg='#34495e', fg='#ecf0f1', 
-                    font=('Arial', 10)).grid(row=0, column=i, padx=10)
+                    font=('Arial', 10)).grid(row=i // 5, column=i % 5, padx=10)
     
     def generate_new_array(self):
-        self.array_size = self.size_slider.get()
-        self.array = [random.randint(10, 350) for _ in range(self.array_size)]
-        self.draw_array()
+        if self.sorting:
+            self.status_label.config(text="Wait for the running sort to finish")
+            return
+        self.close_replay()
+        self.clear_race()
+        self.large = self.large_mode.get()
+        if self.large:
+            self.array_size = int(self.large_size.get())
+            self.array = array('i', [random.randint(1, 1 << 20) for _ in range(self.array_size)])
+            self.bar_renderer.clear()
+            self.renderer = self.column_renderer
+        else:
+            self.array_size = self.size_slider.get()
+            self.array = [random.randint(10, 350) for _ in range(self.array_size)]
+            self.column_renderer.clear()
+            self.renderer = self.bar_renderer
+        self.renderer.reset(self.array)
+        self.highlight = ()
+        self.repaint()
         self.status_label.config(text="New array generated")
     
-    def draw_array(self, color_array=None):
-        self.canvas.delete("all")
-        canvas_width = 950
-        canvas_height = 400
-        bar_width = canvas_width / len(self.array)
-        
-        max_val = max(self.array)
-        
-        for i, height in enumerate(self.array):
-            x0 = i * bar_width
-            y0 = canvas_height - (height / max_val * 350)
-            x1 = (i + 1) * bar_width - 2
-            y1 = canvas_height
-            
-            color = '#3498db'
-            if color_array:
-                color = color_array[i]
-            
-            self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline='')
-        
-        self.root.update()
-    
-    def start_sorting(self, algorithm):
+    def apply_event(self, event):
+        op, a, b = event
+        if op == sorting_engine.SWAP:
+            self.array[a], self.array[b] = self.array[b], self.array[a]
+            self.renderer.mark(a)
+            self.renderer.mark(b)
+            self.highlight = (a, b)
+        elif op == sorting_engine.WRITE:
+            self.array[a] = b
+            self.renderer.mark(a)
+            self.highlight = (a,)
+    
+    def repaint(self):
+        self.renderer.highlight(self.highlight)
+        self.renderer.repaint()
+        self.fps_label.config(text=f"{self.renderer.fps:.0f} fps")
+        self.update_stats()
+    
+    def update_stats(self):
+        # The worker owns self.stats; reading its int fields here is safe
+        if self.stats is None:
+            self.stats_label.config(text="")
+            return
+        st = self.stats
+        self.stats_label.config(text=f"Comparisons: {st.comparisons}   Swaps: {st.swaps}   "
+                                     f"Writes: {st.writes}   Aux Memory: {st.aux_memory}   "
+                                     f"Recursion Depth: {st.max_depth}")
+    
+    def start_sorting(self, algorithm, make_events=None, finish=None):
+        # make_events(work) may supply a custom event stream (e.g. a
+        # selection); finish then replaces finish_sorting
+        # One run at a time; a second worker would fight over the display
+        if self.sorting:
+            self.status_label.config(text="A sort is already running")
+            return
+        # self.array may be the player's array; sorting it would corrupt the trace
+        self.close_replay()
+        if self.race:
+            # Leave race view and sort the same input on the main canvas
+            self.clear_race()
+            self.renderer.reset(self.array)
+        if self.large and algorithm in ("bubble", "selection", "insertion"):
+            messagebox.showwarning("Large Array Mode",
+                                   "Quadratic sorts are too slow for large arrays.\n"
+                                   "Choose an O(n log n) algorithm instead.")
+            return
+        
         self.speed = 200 - self.speed_slider.get()
+        self.scheduler.fps = self.fps_slider.get()
         self.status_label.config(text=f"Running {algorithm.replace('_', ' ').title()}...")
+        self.auto_note = None
         
-        thread = Thread(target=lambda: self.sort_array(algorithm))
+        # The worker sorts its own copy; the display array is only
+        # updated on the main thread as events are drained
+        work = self.array[:]
+        self.stats = sorting_engine.SortStats() if self.count_ops.get() else None
+        
+        recorder = None
+        if self.record_trace.get():
+            path = filedialog.asksaveasfilename(title="Save sort trace", defaultextension=".trace",
+                                                filetypes=[("Sort traces", "*.trace")])
+            if path:
+                recorder = TraceRecorder(path, work)
+        
+        self.sorting = True
+        events = make_events(work) if make_events else None
+        thread = Thread(target=lambda: self.sort_array(algorithm, work, self.stats, recorder,
+                                                       events, finish))
         thread.daemon = True
         thread.start()
     
-    def sort_array(self, algorithm):
-        if algorithm == "bubble":
-            self.bubble_sort()
-        elif algorithm == "selection":
-            self.selection_sort()
-        elif algorithm == "insertion":
-            self.insertion_sort()
-        elif algorithm == "quick":
-            self.quick_sort(0, len(self.array)-1)
-        elif algorithm == "merge":
-            self.merge_sort(0, len(self.array)-1)
-        
-        self.status_label.config(text="Sorting completed!")
-        self.draw_array(['#2ecc71'] * len(self.array))
-    
-    def bubble_sort(self):
-        n = len(self.array)
-        for i in range(n):
-            for j in range(0, n-i-1):
-                if self.array[j] > self.array[j+1]:
-                    self.array[j], self.array[j+1] = self.array[j+1], self.array[j]
-                    colors = ['#e74c3c' if x == j or x == j+1 else '#3498db' for x in range(n)]
-                    self.draw_array(colors)
-                    time.sleep(self.speed / 1000)
-    
-    def selection_sort(self):
-        n = len(self.array)
-        for i in range(n):
-            min_idx = i
-            for j in range(i+1, n):
-                if self.array[j] < self.array[min_idx]:
-                    min_idx = j
-            
-            self.array[i], self.array[min_idx] = self.array[min_idx], self.array[i]
-            colors = ['#e74c3c' if x == i or x == min_idx else '#3498db' for x in range(n)]
-            self.draw_array(colors)
-            time.sleep(self.speed / 1000)
-    
-    def insertion_sort(self):
+    def sort_array(self, algorithm, work, stats=None, recorder=None, events=None, finish=None):
+        post = self.scheduler.post
+        if events is None and algorithm == sorting_engine.AUTO:
+            # The analysis is O(n log n), so it runs here and not in the UI
+            algorithm, reason = recommend(work)
+            name = algorithm.replace('_', ' ').title()
+            post(lambda: self.show_auto_choice(f"Auto chose {name}: {reason}"))
+        # Per-event pacing would make a large-array sort take hours, so large
+        # mode streams batches and the render loop paces it per frame
+        delay = 0 if self.large else self.speed / 1000
+        batch = []
+        record = stats.record if stats else None
+        save = recorder.record if recorder else None
+        if events is None:
+            events = sorting_engine.sort_events(work, algorithm)
+        for event in events:
+            if record:
+                record(event)
+            if save:
+                save(event)
+            op = event[0]
+            if op != sorting_engine.SWAP and op != sorting_engine.WRITE:
+                continue
+            if delay:
+                post(event)
+                time.sleep(delay if op == sorting_engine.SWAP else delay / 2)
+            else:
+                # No pacing: hand events over in batches to keep queue
+                # overhead low on large arrays
+                batch.append(event)
+                if len(batch) >= 1024:
+                    post(batch)
+                    batch = []
+        
+        if batch:
+            post(batch)
+        if recorder:
+            recorder.close()
+        post(finish or self.finish_sorting)
+    
+    def show_auto_choice(self, note):
+        self.auto_note = note
+        self.status_label.config(text=note)
+    
+    def finish_sorting(self):
+        self.sorting = False
+        self.highlight = ()
+        text = "Sorting completed!"
+        if self.auto_note:
+            text += f"  {self.auto_note}"
+        self.status_label.config(text=text)
+        self.renderer.highlight(())
+        self.renderer.repaint('#2ecc71')
+        self.update_stats()
+
+    def start_selection(self, kind):
+        # Order statistics run through the same worker and render loop
         n = len(self.array)
-        for i in range(1, n):
-            key = self.array[i]
-            j = i-1
-            while j >= 0 and key < self.array[j]:
-                self.array[j+1] = self.array[j]
-                j -= 1
-            self.array[j+1] = key
-            
-            colors = ['#e74c3c' if x == i or x == j+1 else '#3498db' for x in range(n)]
-            self.draw_array(colors)
-            time.sleep(self.speed / 1000)
-    
-    def quick_sort(self, low, high):
-        if low < high:
-            pi = self.partition(low, high)
-            self.quick_sort(low, pi-1)
-            self.quick_sort(pi+1, high)
-    
-    def partition(self, low, high):
-        pivot = self.array[high]
-        i = low - 1
-        
-        for j in range(low, high):
-            if self.array[j] <= pivot:
-                i += 1
-                self.array[i], self.array[j] = self.array[j], self.array[i]
-        
-        self.array[i+1], self.array[high] = self.array[high], self.array[i+1]
-        
-        colors = ['#e74c3c' if x == i+1 or x == high else '#3498db' for x in range(len(self.array))]
-        self.draw_array(colors)
-        time.sleep(self.speed / 1000)
-        
-        return i + 1
-    
-    def merge_sort(self, l, r):
-        if l < r:
-            m = (l + r) // 2
-            self.merge_sort(l, m)
-            self.merge_sort(m+1, r)
-            self.merge(l, m, r)
-    
-    def merge(self, l, m, r):
-        n1 = m - l + 1
-        n2 = r - m
-        
-        L = self.array[l:m+1]
-        R = self.array[m+1:r+1]
-        
-        i = j = 0
-        k = l
-        
-        while i < n1 and j < n2:
-            if L[i] <= R[j]:
-                self.array[k] = L[i]
-                i += 1
+        if kind == "nth":
+            ranks = [(n - 1) // 2]
+            arg = ranks[0]
+        elif kind == "partial":
+            ranks = list(range(min(10, n)))
+            arg = len(ranks)
+        else:
+            ranks = [(n - 1) * q // 4 for q in (1, 2, 3)]
+            arg = ranks
+        select = order_statistics.SELECTIONS[kind]
+        self.start_sorting(kind, lambda work: select(work, arg),
+                           lambda: self.finish_selection(kind, ranks))
+    
+    def finish_selection(self, kind, ranks):
+        self.sorting = False
+        values = ", ".join(str(self.array[k]) for k in ranks)
+        names = {"nth": "Median", "partial": "Smallest 10", "multi": "Quartiles"}
+        self.status_label.config(text=f"{names[kind]}: {values}  (highlighted, array only partially ordered)")
+        self.highlight = tuple(ranks)
+        self.renderer.highlight(ranks)
+        self.renderer.repaint()
+        self.update_stats()
+    
+    def start_race(self):
+        if self.sorting:
+            self.status_label.config(text="A sort is already running")
+            return
+        if self.large:
+            messagebox.showwarning("Race Mode", "Race mode needs a normal-size array.\n"
+                                                "Turn off Large Array Mode first.")
+            return
+        self.close_replay()
+        
+        data = list(self.array)
+        if self.race:
+            self.clear_race()
+        algorithms = list(sorting_engine.ALGORITHMS)
+        mode = self.race_mode.get()
+        # Slider maps to the per-round budget: work units or microseconds
+        speed = self.speed_slider.get()
+        quantum = max(1, speed // 10) if mode == "ops" else speed * 1e-5
+        self.race = SortRace(data, algorithms, mode, quantum)
+        
+        # Every algorithm gets its own horizontal lane on the canvas
+        self.bar_renderer.clear()
+        self.column_renderer.clear()
+        lane_height = 400 / len(algorithms)
+        self.race_renderers = []
+        for i, lane in enumerate(self.race.lanes):
+            renderer = BarRenderer(self.canvas, 950, lane_height, max_bar_height=lane_height - 4,
+                                   tag="race", y=i * lane_height)
+            renderer.reset(lane.array)
+            renderer.repaint()
+            self.race_renderers.append(renderer)
+            self.canvas.create_text(4, i * lane_height + 2, text=lane.name, anchor=tk.NW,
+                                    fill='#ecf0f1', font=('Arial', 8, 'bold'), tags="race")
+        
+        self.sorting = True
+        self.stats = None
+        self.update_stats()
+        self.status_label.config(text=f"Racing {len(algorithms)} algorithms by {mode}...")
+        self.race_tick()
+    
+    def race_tick(self):
+        if not self.race:
+            return
+        for i, events in self.race.step().items():
+            renderer = self.race_renderers[i]
+            for op, a, b in events:
+                renderer.mark(a)
+                if op == sorting_engine.SWAP:
+                    renderer.mark(b)
+            last = events[-1] if events else None
+            if last is None:
+                renderer.highlight(())
+            elif last[0] == sorting_engine.SWAP:
+                renderer.highlight((last[1], last[2]))
             else:
-                self.array[k] = R[j]
-                j += 1
-            
-            colors = ['#e74c3c' if x == k else '#3498db' for x in range(len(self.array))]
-            self.draw_array(colors)
-            time.sleep(self.speed / 2000)
-            k += 1
-        
-        while i < n1:
-            self.array[k] = L[i]
-            colors = ['#e74c3c' if x == k else '#3498db' for x in range(len(self.array))]
-            self.draw_array(colors)
-            time.sleep(self.speed / 2000)
-            i += 1
-            k += 1
-        
-        while j < n2:
-            self.array[k] = R[j]
-            colors = ['#e74c3c' if x == k else '#3498db' for x in range(len(self.array))]
-            self.draw_array(colors)
-            time.sleep(self.speed / 2000)
-            j += 1
-            k += 1
+                renderer.highlight((last[1],))
+            renderer.repaint()
+        
+        for renderer, lane in zip(self.race_renderers, self.race.lanes):
+            if lane.done and lane.finish_round == self.race.rounds:
+                renderer.highlight(())
+                renderer.repaint('#2ecc71')
+        
+        if self.race.done:
+            self.finish_race()
+        else:
+            self.root.after(max(1, 1000 // self.fps_slider.get()), self.race_tick)
+    
+    def finish_race(self):
+        self.sorting = False
+        self.status_label.config(text="Race completed!")
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Race Results")
+        dialog.configure(bg='#2c3e50')
+        dialog.transient(self.root)
+        
+        tk.Label(dialog, text=f"Race Results (ranked by {self.race.mode})",
+                font=('Arial', 14, 'bold'), bg='#2c3e50', fg='white').pack(pady=10)
+        tk.Label(dialog, text=self.race.format_ranking(), justify=tk.LEFT,
+                font=('Consolas', 10), bg='#2c3e50', fg='#ecf0f1').pack(padx=20, pady=10)
+        tk.Button(dialog, text="Close", command=dialog.destroy,
+                 bg='#e74c3c', fg='white', font=('Arial', 10, 'bold'),
+                 padx=20, pady=8).pack(pady=10)
+    
+    def clear_race(self):
+        self.race = None
+        self.race_renderers = []
+        self.canvas.delete("race")
+    
+    def open_replay(self):
+        if self.sorting:
+            self.status_label.config(text="Wait for the running sort to finish")
+            return
+        path = filedialog.askopenfilename(title="Open sort trace",
+                                          filetypes=[("Sort traces", "*.trace"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            player = TracePlayer(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not open trace:\n\n{e}")
+            return
+        
+        if self.player:
+            self.player.close()
+        self.player = player
+        self.replay_playing = False
+        self.clear_race()
+        
+        # The player owns the replayed array; render it in place
+        self.array = player.array
+        self.large = len(self.array) > 950
+        self.bar_renderer.clear()
+        self.column_renderer.clear()
+        self.renderer = self.column_renderer if self.large else self.bar_renderer
+        self.renderer.reset(self.array)
+        self.highlight = ()
+        self.stats = None
+        self.repaint()
+        
+        self.replay_slider.config(to=player.length)
+        self.replay_slider.set(0)
+        for btn in self.replay_buttons:
+            btn.config(state=tk.NORMAL)
+        self.status_label.config(text=f"Loaded trace: {player.length} steps, {player.n} elements")
+    
+    def close_replay(self):
+        # Detaches a loaded trace; the replayed array stays on screen as
+        # ordinary data
+        if not self.player:
+            return
+        self.replay_playing = False
+        self.player.close()
+        self.player = None
+        for btn in self.replay_buttons:
+            btn.config(state=tk.DISABLED)
+        self.replay_slider.config(to=0)
+        self.replay_slider.set(0)
+    
+    def show_replay_record(self, record):
+        if record is None:
+            return
+        op, a, b, _ = record
+        if op == sorting_engine.SWAP:
+            self.renderer.mark(a)
+            self.renderer.mark(b)
+            self.highlight = (a, b)
+        elif op == sorting_engine.WRITE:
+            self.renderer.mark(a)
+            self.highlight = (a,)
+        elif op == sorting_engine.COMPARE:
+            self.highlight = (a, b)
+    
+    def replay_step_forward(self):
+        if self.player:
+            self.show_replay_record(self.player.step_forward())
+            self.replay_slider.set(self.player.position)
+            self.repaint()
+    
+    def replay_step_back(self):
+        if self.player:
+            self.show_replay_record(self.player.step_backward())
+            self.replay_slider.set(self.player.position)
+            self.repaint()
+    
+    def replay_seek(self, value):
+        # Also called when the slider is moved programmatically; only a
+        # real jump needs a seek
+        if not self.player or int(value) == self.player.position:
+            return
+        self.player.seek(int(value))
+        self.renderer.invalidate()
+        self.highlight = ()
+        self.repaint()
+    
+    def replay_toggle(self):
+        if not self.player:
+            return
+        self.replay_playing = not self.replay_playing
+        if self.replay_playing:
+            self.replay_tick()
+    
+    def replay_tick(self):
+        if not self.replay_playing or not self.player:
+            return
+        step_forward = self.player.step_forward
+        for _ in range(self.replay_rate.get()):
+            record = step_forward()
+            if record is None:
+                self.replay_playing = False
+                break
+            self.show_replay_record(record)
+        
+        self.replay_slider.set(self.player.position)
+        self.repaint()
+        if self.replay_playing:
+            self.root.after(max(1, 1000 // self.fps_slider.get()), self.replay_tick)
+        else:
+            self.status_label.config(text="Replay finished")
+
+    def open_network_view(self):
+        # Shows a sorting network as wires and comparators and runs the
+        # first power-of-two slice of the array through it layer by layer
+        if self.network_dialog is not None and self.network_dialog.winfo_exists():
+            self.network_dialog.lift()
+            return
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Sorting Network")
+        dialog.configure(bg='#2c3e50')
+        self.network_dialog = dialog
+        
+        controls = tk.Frame(dialog, bg='#34495e')
+        controls.pack(pady=5)
+        self.network_name = tk.StringVar(value="bitonic")
+        tk.OptionMenu(controls, self.network_name, *NETWORKS,
+                     command=lambda _: self.reset_network()).pack(side=tk.LEFT, padx=5)
+        for text, command in [("Reset", self.reset_network),
+                              ("Next Layer", self.network_step),
+                              ("Play", self.network_play)]:
+            tk.Button(controls, text=text, command=command, bg='#3498db', fg='white',
+                     font=('Arial', 9, 'bold'), padx=10).pack(side=tk.LEFT, padx=5)
+        
+        self.network_canvas = tk.Canvas(dialog, width=900, height=560, bg='#1a1a2e')
+        self.network_canvas.pack(padx=10, pady=5)
+        self.network_status = tk.Label(dialog, text="", bg='#2c3e50', fg='#ecf0f1',
+                                      font=('Arial', 10))
+        self.network_status.pack(pady=5)
+        self.reset_network()
+    
+    def reset_network(self):
+        width = 2
+        while width * 2 <= min(len(self.array), 32):
+            width *= 2
+        self.network_values = list(self.array[:width])
+        self.network = network_layers(self.network_name.get(), width)
+        self.network_layer = 0
+        self.network_playing = False
+        
+        canvas = self.network_canvas
+        canvas.delete("all")
+        spacing = min(32, 520 / width)
+        wire_y = [20 + i * spacing for i in range(width)]
+        
+        # Comparators of one layer that overlap vertically get their own
+        # column so every vertical line stays readable
+        columns = []
+        for layer in self.network:
+            ends = []
+            placed = []
+            for i, j in layer:
+                col = next((c for c, end in enumerate(ends) if end < i), len(ends))
+                if col == len(ends):
+                    ends.append(j)
+                else:
+                    ends[col] = j
+                placed.append((col, i, j))
+            columns.append((len(ends), placed))
+        total = sum(count for count, _ in columns) + len(columns)
+        step = min(24, 760 / max(1, total))
+        
+        self.network_lines = []
+        x = 70
+        for k, (count, placed) in enumerate(columns):
+            lines = []
+            for col, i, j in placed:
+                cx = x + col * step
+                canvas.create_oval(cx - 3, wire_y[i] - 3, cx + 3, wire_y[i] + 3, fill='#ecf0f1')
+                canvas.create_oval(cx - 3, wire_y[j] - 3, cx + 3, wire_y[j] + 3, fill='#ecf0f1')
+                lines.append(canvas.create_line(cx, wire_y[i], cx, wire_y[j], fill='#ecf0f1', width=2))
+            self.network_lines.append(lines)
+            x += (count + 1) * step
+        for y in wire_y:
+            canvas.tag_lower(canvas.create_line(60, y, x, y, fill='#7f8c8d'))
+        
+        self.network_labels = [canvas.create_text(30, y, text=str(v), fill='#f1c40f',
+                                                 font=('Consolas', 9))
+                               for v, y in zip(self.network_values, wire_y)]
+        comparators = sum(len(layer) for layer in self.network)
+        self.network_status.config(text=f"{width} wires, {len(self.network)} layers, "
+                                        f"{comparators} comparators")
+    
+    def network_step(self):
+        if self.network_layer >= len(self.network):
+            self.network_playing = False
+            return
+        canvas = self.network_canvas
+        if self.network_layer:
+            for line in self.network_lines[self.network_layer - 1]:
+                canvas.itemconfig(line, fill='#7f8c8d')
+        
+        values = self.network_values
+        layer = self.network[self.network_layer]
+        for (i, j), line in zip(layer, self.network_lines[self.network_layer]):
+            swapped = values[j] < values[i]
+            if swapped:
+                values[i], values[j] = values[j], values[i]
+            canvas.itemconfig(line, fill='#e74c3c' if swapped else '#2ecc71')
+        for label, v in zip(self.network_labels, values):
+            canvas.itemconfig(label, text=str(v))
+        
+        self.network_layer += 1
+        self.network_status.config(text=f"Layer {self.network_layer} / {len(self.network)}: "
+                                        f"{len(layer)} compare-exchanges in parallel")
+    
+    def network_play(self):
+        self.network_playing = True
+        self.network_tick()
+    
+    def network_tick(self):
+        if not self.network_playing or not self.network_dialog.winfo_exists():
+            return
+        self.network_step()
+        if self.network_playing:
+            self.root.after(max(50, (200 - self.speed_slider.get()) * 4), self.network_tick)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,147 @@
+from collections import deque
+
+from sorting_engine import (DEPTH, SWAP, _choose_pivot, _insertion_sort_range,
+                            _intro_loop, _partition3)
+
+# Order statistics without a full sort.
+#
+# Selection reuses the engine's partition machinery (ninther pivot and
+# Dijkstra three-way partition) and yields the same compare/swap/write
+# events as the sorts, so every routine here can be animated or counted.
+#
+# Introselect: quickselect runs until two partitions in a row fail to halve
+# the range, then the pivot is taken by median-of-medians for the rest of
+# the search, which bounds the worst case at O(n).
+
+CUTOFF = 16
+
+
+def _select(a, lo, hi, k, level=1):
+    # Rearranges a[lo:hi+1] so a[k] is the value that would be there after
+    # sorting, with nothing larger before it and nothing smaller after it
+    yield (DEPTH, level, 0)
+    strikes = 0
+    while hi - lo + 1 > CUTOFF:
+        size = hi - lo + 1
+        if strikes >= 2:
+            p = yield from _mom_pivot(a, lo, hi, level)
+        else:
+            p = yield from _choose_pivot(a, lo, hi)
+        lt, gt = yield from _partition3(a, lo, hi, p)
+
+        if k < lt:
+            hi = lt - 1
+        elif k > gt:
+            lo = gt + 1
+        else:
+            return
+        strikes = 0 if hi - lo + 1 <= size // 2 else strikes + 1
+
+    yield from _insertion_sort_range(a, lo, hi + 1)
+
+
+def _mom_pivot(a, lo, hi, level):
+    # Median of medians of groups of five. Group medians are gathered at
+    # the front of the range and their median is found recursively.
+    count = 0
+    for g in range(lo, hi + 1, 5):
+        end = min(g + 5, hi + 1)
+        yield from _insertion_sort_range(a, g, end)
+        m = g + (end - g - 1) // 2
+        dst = lo + count
+        if m != dst:
+            a[m], a[dst] = a[dst], a[m]
+            yield (SWAP, m, dst)
+        count += 1
+
+    mid = lo + (count - 1) // 2
+    yield from _select(a, lo, lo + count - 1, mid, level + 1)
+    return mid
+
+
+def nth_element(a, k):
+    # Partial ordering: a[k] is placed as if a were sorted, with a[:k] <= a[k] <= a[k+1:]
+    n = len(a)
+    if not 0 <= k < n:
+        raise IndexError(f"rank {k} out of range for {n} elements")
+    yield from _select(a, 0, n - 1, k)
+
+
+def partial_sort(a, k):
+    # The k smallest values end up sorted in a[:k]; the rest is unordered
+    n = len(a)
+    k = min(k, n)
+    if k <= 0:
+        return
+    if k < n:
+        yield from _select(a, 0, n - 1, k - 1)
+    yield from _intro_loop(a, 0, k - 1, 2 * k.bit_length(), CUTOFF)
+
+
+def multi_select(a, ranks):
+    # Places every rank in `ranks` in one recursive pass: the middle rank
+    # is selected first and splits both the array and the remaining ranks,
+    # so each half is only searched for the ranks that fall inside it
+    n = len(a)
+    ranks = sorted(set(ranks))
+    if ranks and not (0 <= ranks[0] and ranks[-1] < n):
+        raise IndexError(f"ranks out of range for {n} elements")
+    yield from _multi_select(a, 0, n - 1, ranks, 0, len(ranks))
+
+
+def _multi_select(a, lo, hi, ranks, first, last, level=1):
+    if first >= last or lo > hi:
+        return
+    m = (first + last) // 2
+    k = ranks[m]
+    yield from _select(a, lo, hi, k, level)
+    yield from _multi_select(a, lo, k - 1, ranks, first, m, level + 1)
+    yield from _multi_select(a, k + 1, hi, ranks, m + 1, last, level + 1)
+
+
+SELECTIONS = {
+    "nth": nth_element,
+    "partial": partial_sort,
+    "multi": multi_select,
+}
+
+
+# Headless API; each works on a copy and leaves `data` untouched
+
+def select(data, k):
+    # k-th smallest value (0-based)
+    a = list(data)
+    deque(nth_element(a, k), maxlen=0)
+    return a[k]
+
+
+def median(data):
+    # Lower median for even lengths
+    return select(data, (len(data) - 1) // 2)
+
+
+def select_many(data, ranks):
+    # Values at several ranks, in the order the ranks were given
+    a = list(data)
+    deque(multi_select(a, ranks), maxlen=0)
+    return [a[k] for k in ranks]
+
+
+def smallest(data, k):
+    # The k smallest values in ascending order
+    a = list(data)
+    deque(partial_sort(a, k), maxlen=0)
+    return a[:k]
+
+
+def largest(data, k):
+    # The k largest values in descending order
+    a = list(data)
+    n = len(a)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    if k < n:
+        deque(_select(a, 0, n - 1, n - k), maxlen=0)
+    deque(_intro_loop(a, n - k, n - 1, 2 * k.bit_length(), CUTOFF), maxlen=0)
+    return a[n - k:][::-1]
@@ -0,0 +1,285 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from multiprocessing import resource_tracker, shared_memory
+
+import sorting_engine
+
+# Multi-process sorting of integer arrays. The data lives in
+# multiprocessing.shared_memory blocks; workers attach to them by name and
+# only block names and index ranges are ever pickled.
+#
+# Two strategies are available:
+#   "merge"  - every worker sorts one chunk; the sorted chunks are then cut
+#              at regularly sampled splitters and each worker k-way merges
+#              one slice of the output (parallel sorting by regular sampling)
+#   "sample" - splitters are drawn from a random sample first; workers
+#              count and scatter their chunk into per-bucket output ranges,
+#              then each worker sorts one bucket in place
+
+
+def _sort_list(values, algorithm):
+    # None uses the built-in Timsort; any engine algorithm name also works
+    if algorithm is None:
+        values.sort()
+        return values
+    return sorting_engine.sort(values, algorithm)
+
+
+def _attach(name, typecode):
+    # Workers only borrow the parent's blocks. Before Python 3.13 attaching
+    # also registers the block with the worker's resource tracker, which
+    # would unlink it when the worker exits, so registration is skipped.
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+    return shm, shm.buf.cast(typecode)
+
+
+def _detach(shm, view):
+    view.release()
+    shm.close()
+
+
+def _sort_chunk(name, typecode, lo, hi, algorithm):
+    shm, view = _attach(name, typecode)
+    try:
+        chunk = _sort_list(view[lo:hi].tolist(), algorithm)
+        view[lo:hi] = array(typecode, chunk)
+    finally:
+        _detach(shm, view)
+
+
+def _merge_segments(in_name, out_name, typecode, segments, offset):
+    src_shm, src = _attach(in_name, typecode)
+    dst_shm, dst = _attach(out_name, typecode)
+    try:
+        runs = [src[lo:hi].tolist() for lo, hi in segments if hi > lo]
+        merged = array(typecode, merge(*runs))
+        dst[offset:offset + len(merged)] = merged
+    finally:
+        _detach(src_shm, src)
+        _detach(dst_shm, dst)
+
+
+def _count_buckets(name, typecode, lo, hi, splitters):
+    shm, view = _attach(name, typecode)
+    try:
+        counts = [0] * (len(splitters) + 1)
+        for x in view[lo:hi].tolist():
+            counts[bisect_right(splitters, x)] += 1
+        return counts
+    finally:
+        _detach(shm, view)
+
+
+def _scatter_buckets(in_name, out_name, typecode, lo, hi, splitters, offsets):
+    src_shm, src = _attach(in_name, typecode)
+    dst_shm, dst = _attach(out_name, typecode)
+    try:
+        buckets = [[] for _ in range(len(splitters) + 1)]
+        for x in src[lo:hi].tolist():
+            buckets[bisect_right(splitters, x)].append(x)
+        for bucket, offset in zip(buckets, offsets):
+            dst[offset:offset + len(bucket)] = array(typecode, bucket)
+    finally:
+        _detach(src_shm, src)
+        _detach(dst_shm, dst)
+
+
+def _chunk_bounds(n, parts):
+    return [n * i // parts for i in range(parts + 1)]
+
+
+def _combine_merge(pool, src_name, dst_name, view, bounds, workers, typecode, algorithm):
+    list(pool.map(_sort_chunk, [src_name] * workers, [typecode] * workers,
+                  bounds[:-1], bounds[1:], [algorithm] * workers))
+
+    # Regular sampling: `workers` evenly spaced keys from each sorted chunk
+    samples = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        step = max(1, (hi - lo) // workers)
+        samples.extend(view[i] for i in range(lo, hi, step))
+    samples.sort()
+    splitters = [samples[len(samples) * j // workers] for j in range(1, workers)]
+
+    # cuts[c][j] is where output slice j starts inside sorted chunk c
+    cuts = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        cuts.append([lo] + [bisect_left(view, s, lo, hi) for s in splitters] + [hi])
+
+    tasks = []
+    offset = 0
+    for j in range(workers):
+        segments = [(cuts[c][j], cuts[c][j + 1]) for c in range(workers)]
+        tasks.append((segments, offset))
+        offset += sum(hi - lo for lo, hi in segments)
+
+    list(pool.map(_merge_segments, [src_name] * workers, [dst_name] * workers,
+                  [typecode] * workers, [t[0] for t in tasks], [t[1] for t in tasks]))
+
+
+def _combine_sample(pool, src_name, dst_name, view, bounds, workers, typecode,
+                    algorithm, oversample=32, seed=0):
+    n = bounds[-1]
+    rng = random.Random(seed)
+    sample = sorted(view[rng.randrange(n)] for _ in range(workers * oversample))
+    splitters = [sample[len(sample) * j // workers] for j in range(1, workers)]
+
+    counts = list(pool.map(_count_buckets, [src_name] * workers, [typecode] * workers,
+                           bounds[:-1], bounds[1:], [splitters] * workers))
+
+    # offsets[c][b]: where chunk c writes its share of bucket b
+    offsets = [[0] * workers for _ in range(workers)]
+    bucket_bounds = [0]
+    position = 0
+    for b in range(workers):
+        for c in range(workers):
+            offsets[c][b] = position
+            position += counts[c][b]
+        bucket_bounds.append(position)
+
+    list(pool.map(_scatter_buckets, [src_name] * workers, [dst_name] * workers,
+                  [typecode] * workers, bounds[:-1], bounds[1:],
+                  [splitters] * workers, offsets))
+
+    list(pool.map(_sort_chunk, [dst_name] * workers, [typecode] * workers,
+                  bucket_bounds[:-1], bucket_bounds[1:], [algorithm] * workers))
+
+
+COMBINE = {
+    "merge": _combine_merge,
+    "sample": _combine_sample,
+}
+
+
+def parallel_sort(data, workers=None, combine="merge", typecode='q', algorithm=None,
+                  pool=None):
+    # Sorts integers on `workers` processes and returns an array(typecode).
+    # Pass an existing ProcessPoolExecutor as `pool` to reuse its workers.
+    if combine not in COMBINE:
+        raise ValueError(f"Unknown combine strategy: {combine}")
+    workers = workers or os.cpu_count() or 1
+
+    values = data if isinstance(data, array) and data.typecode == typecode else array(typecode, data)
+    n = len(values)
+    if n < 2 or workers == 1:
+        return array(typecode, _sort_list(values.tolist(), algorithm))
+    workers = min(workers, n)
+
+    size = max(1, n * values.itemsize)
+    src_shm = shared_memory.SharedMemory(create=True, size=size)
+    dst_shm = shared_memory.SharedMemory(create=True, size=size)
+    src = src_shm.buf.cast(typecode)
+    dst = dst_shm.buf.cast(typecode)
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        src[:n] = values
+        bounds = _chunk_bounds(n, workers)
+        COMBINE[combine](pool, src_shm.name, dst_shm.name, src, bounds, workers,
+                         typecode, algorithm)
+        result = array(typecode)
+        result.frombytes(dst[:n].tobytes())
+        return result
+    finally:
+        if own_pool:
+            pool.shutdown()
+        src.release()
+        dst.release()
+        for shm in (src_shm, dst_shm):
+            shm.close()
+            shm.unlink()
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+def scaling_report(n, worker_counts, combine="merge", seed=0, algorithm=None):
+    # Times parallel_sort on the same random input for each worker count.
+    # Pool start-up is excluded so the figures show sorting throughput.
+    rng = random.Random(seed)
+    data = array('q', (rng.randrange(n) for _ in range(n)))
+
+    start = time.perf_counter()
+    baseline = array('q', _sort_list(data.tolist(), algorithm))
+    serial_time = time.perf_counter() - start
+
+    rows = []
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_warm_up, range(workers)))
+            start = time.perf_counter()
+            result = parallel_sort(data, workers, combine, algorithm=algorithm, pool=pool)
+            elapsed = time.perf_counter() - start
+
+        if result != baseline:
+            raise AssertionError(f"parallel_sort gave a wrong result with {workers} workers")
+
+        rows.append({
+            "workers": workers,
+            "time": elapsed,
+            "speedup": serial_time / elapsed,
+            "efficiency": serial_time / elapsed / workers,
+        })
+
+    return {"n": n, "combine": combine, "serial_time": serial_time, "rows": rows}
+
+
+def default_worker_counts():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= max(8, cores):
+        counts.append(counts[-1] * 2)
+    if cores not in counts:
+        counts.append(cores)
+    return sorted(counts)
+
+
+def format_report(report):
+    lines = [f"n={report['n']} combine={report['combine']} "
+             f"serial={report['serial_time']:.3f}s",
+             f"{'workers':>7} {'time (s)':>10} {'speedup':>8} {'efficiency':>10}"]
+    for row in report["rows"]:
+        lines.append(f"{row['workers']:>7} {row['time']:>10.3f} {row['speedup']:>8.2f} "
+                     f"{row['efficiency']:>10.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling report for the parallel sort")
+    parser.add_argument("-n", type=int, default=10 ** 7)
+    parser.add_argument("--workers", nargs="+", type=int, default=default_worker_counts())
+    parser.add_argument("--combine", choices=list(COMBINE), default="merge")
+    parser.add_argument("--algorithm", choices=list(sorting_engine.ALGORITHMS),
+                        help="engine algorithm for chunks (default: built-in sort)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = scaling_report(args.n, args.workers, args.combine, args.seed, args.algorithm)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import math
+
+# Measures how much order an input already has and picks the cheapest
+# engine algorithm for it. The measures are:
+#   inversions   - pairs i < j with a[i] > a[j], counted in O(n log n)
+#                  with a Fenwick tree over value ranks
+#   runs         - maximal non-decreasing runs (what natural merge sees)
+#   longest_run  - length of the longest of those runs
+#   distinct     - number of distinct values
+# This module has no dependencies so the engine can import it directly.
+
+# Inputs this small go to insertion sort whatever their order
+SMALL_INPUT = 16
+# Insertion sort does n + inversions work; allow this many per element
+INVERSIONS_PER_ITEM = 2
+
+
+class Presortedness:
+    __slots__ = ("n", "inversions", "runs", "longest_run", "distinct",
+                 "integers", "span")
+
+    def __init__(self, n, inversions, runs, longest_run, distinct, integers, span):
+        self.n = n
+        self.inversions = inversions
+        self.runs = runs
+        self.longest_run = longest_run
+        self.distinct = distinct
+        self.integers = integers  # every value is an int, so radix applies
+        self.span = span          # max - min
+
+    @property
+    def sortedness(self):
+        # 1.0 for sorted input, 0.0 for reversed input
+        max_inversions = self.n * (self.n - 1) // 2
+        if max_inversions == 0:
+            return 1.0
+        return 1.0 - self.inversions / max_inversions
+
+    def as_dict(self):
+        return {
+            "n": self.n,
+            "inversions": self.inversions,
+            "runs": self.runs,
+            "longest_run": self.longest_run,
+            "distinct": self.distinct,
+            "sortedness": self.sortedness,
+        }
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v}" for k, v in self.as_dict().items())
+        return f"Presortedness({fields})"
+
+
+def value_ranks(a):
+    # Dense ranks 1..distinct, one per position. Sorting the indices needs
+    # only `<`, so values do not have to be hashable (lists, for example);
+    # returns (ranks, distinct)
+    ranks = [0] * len(a)
+    rank = 0
+    previous = None
+    for i in sorted(range(len(a)), key=a.__getitem__):
+        if previous is None or a[previous] < a[i]:
+            rank += 1
+        ranks[i] = rank
+        previous = i
+    return ranks, rank
+
+
+def count_inversions(a, ranks=None):
+    # Scans right to left; the tree counts how many values already seen
+    # (to the right) have a smaller rank than the current one
+    if ranks is None:
+        ranks, size = value_ranks(a)
+    else:
+        size = max(ranks, default=0)
+    tree = [0] * (size + 1)
+    inversions = 0
+    for i in range(len(a) - 1, -1, -1):
+        r = ranks[i] - 1
+        while r > 0:
+            inversions += tree[r]
+            r -= r & -r
+        r = ranks[i]
+        while r <= size:
+            tree[r] += 1
+            r += r & -r
+    return inversions
+
+
+def analyze(a):
+    n = len(a)
+    if n == 0:
+        return Presortedness(0, 0, 0, 0, 0, True, 0)
+
+    runs = 1
+    longest = current = 1
+    for i in range(1, n):
+        if a[i] < a[i-1]:
+            runs += 1
+            current = 1
+        else:
+            current += 1
+            if current > longest:
+                longest = current
+
+    integers = all(type(v) is int for v in a)
+    span = max(a) - min(a) if integers else 0
+    ranks, distinct = value_ranks(a)
+    return Presortedness(n, count_inversions(a, ranks), runs, longest, distinct,
+                         integers, span)
+
+
+def radix_passes(span, radix=10):
+    # Number of LSD passes the engine's radix sort makes over this span
+    passes = 0
+    exp = 1
+    while exp <= span:
+        exp *= radix
+        passes += 1
+    return passes
+
+
+def choose_algorithm(profile):
+    # Returns (algorithm name, human-readable reason)
+    n = profile.n
+    if n <= SMALL_INPUT:
+        return "insertion", f"only {n} elements: insertion sort has the lowest overhead"
+
+    if profile.inversions <= INVERSIONS_PER_ITEM * n:
+        return "insertion", (f"{profile.inversions} inversions for {n} elements: "
+                             f"insertion sort finishes in about n + inversions steps")
+
+    log_n = math.log2(n)
+    if profile.runs * profile.runs <= n:
+        return "merge", (f"{profile.runs} ascending runs (longest {profile.longest_run}): "
+                         f"natural merge needs only ~log2({profile.runs}) = "
+                         f"{math.log2(profile.runs):.1f} passes instead of {log_n:.1f}")
+
+    if profile.integers:
+        passes = radix_passes(profile.span)
+        if 2 * passes <= log_n:
+            return "radix_lsd", (f"integer keys spanning {profile.span}: {passes} radix "
+                                 f"passes beat ~{log_n:.1f} comparison levels")
+
+    return "intro", (f"little existing order ({profile.runs} runs, sortedness "
+                     f"{profile.sortedness:.2f}): introsort is the safe O(n log n) choice")
+
+
+def recommend(a):
+    # analyze() and choose_algorithm() in one call; returns (name, reason)
+    return choose_algorithm(analyze(a))
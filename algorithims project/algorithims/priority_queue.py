@@ -0,0 +1,462 @@
+import argparse
+import heapq
+import itertools
+import random
+import time
+from array import array
+
+from sorting_engine import BOUNDARY, COMPARE, WRITE
+
+# Addressable max-priority queue on a binary heap.
+#
+# Items sit in an implicit binary heap (node i has children 2i+1, 2i+2)
+# ordered by priority, and a position map from item to heap index lets an
+# item that is already queued be found in O(1). That is what makes
+# decrease_key, increase_key and remove O(log n) instead of the O(n) search
+# a plain heap would need. Priorities live in a list, or in a contiguous
+# array('q') / array('d') when a typecode is given.
+#
+# Like heap_engine, sifts are hole-based, and every operation has an
+# event-emitting twin (push_events, pop_events, ...) that yields the
+# engine's COMPARE / WRITE events with priorities as values, plus
+# (BOUNDARY, n, 0) whenever the queue changes size, so the heap visualizer
+# can animate it. Event positions are heap indices.
+
+
+class IndexedHeap:
+    __slots__ = ("_prio", "_items", "_pos")
+
+    def __init__(self, pairs=(), typecode=None):
+        # pairs: iterable of (item, priority); items must be hashable and unique
+        self._prio = array(typecode) if typecode else []
+        self._items = []
+        self._pos = {}
+        self.heapify(pairs)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._pos
+
+    @property
+    def priorities(self):
+        # The live heap storage, in heap order; read it, do not modify it
+        return self._prio
+
+    def item_at(self, i):
+        return self._items[i]
+
+    def position(self, item):
+        return self._pos[item]
+
+    def priority(self, item):
+        return self._prio[self._pos[item]]
+
+    def peek(self):
+        if not self._items:
+            raise IndexError("peek at an empty queue")
+        return self._items[0], self._prio[0]
+
+    def heapify(self, pairs):
+        # Replaces the contents with `pairs` in O(n) (Floyd's construction)
+        items = []
+        prio = []
+        for item, priority in pairs:
+            items.append(item)
+            prio.append(priority)
+        pos = {item: i for i, item in enumerate(items)}
+        if len(pos) != len(items):
+            raise ValueError("items in a queue must be unique")
+        if type(self._prio) is not list:
+            # Convert up front so a bad priority fails before any change
+            prio = array(self._prio.typecode, prio)
+        del self._prio[:]
+        self._prio.extend(prio)
+        self._items = items
+        self._pos = pos
+        self._rebuild()
+
+    def merge(self, other):
+        # Adds every entry of another IndexedHeap in O(n + m) by appending
+        # its storage and re-heapifying, instead of m pushes; `other` is
+        # left unchanged. Fails without changing anything on a shared item.
+        if other is self:
+            raise ValueError("cannot merge a queue into itself")
+        shared = self._pos.keys() & other._pos.keys()
+        if shared:
+            raise ValueError(f"{next(iter(shared))!r} is queued in both heaps")
+        prio = other._prio
+        if type(self._prio) is not list:
+            # Convert up front so a bad priority fails before any change
+            prio = array(self._prio.typecode, prio)
+        self._prio.extend(prio)
+        self._items.extend(other._items)
+        offset = len(self._pos)
+        for item, i in other._pos.items():
+            self._pos[item] = offset + i
+        self._rebuild()
+
+    def _rebuild(self):
+        # Floyd's construction over the whole storage
+        items = self._items
+        n = len(items)
+        for i in range((n - 2) // 2, -1, -1):
+            self._sift_down(i, items[i], self._prio[i], n)
+
+    def _move(self, src, dst):
+        item = self._items[src]
+        self._prio[dst] = self._prio[src]
+        self._items[dst] = item
+        self._pos[item] = dst
+
+    def _place(self, hole, item, x):
+        self._prio[hole] = x
+        self._items[hole] = item
+        self._pos[item] = hole
+
+    # The plain sifts inline _move and _place; they are the hot path
+
+    def _sift_up(self, hole, item, x):
+        prio, items, pos = self._prio, self._items, self._pos
+        while hole > 0:
+            p = (hole - 1) >> 1
+            y = prio[p]
+            if not y < x:
+                break
+            prio[hole] = y
+            moved = items[hole] = items[p]
+            pos[moved] = hole
+            hole = p
+        prio[hole] = x
+        items[hole] = item
+        pos[item] = hole
+
+    def _sift_down(self, hole, item, x, n):
+        prio, items, pos = self._prio, self._items, self._pos
+        child = 2 * hole + 1
+        while child < n:
+            y = prio[child]
+            if child + 1 < n and prio[child + 1] > y:
+                child += 1
+                y = prio[child]
+            if not y > x:
+                break
+            prio[hole] = y
+            moved = items[hole] = items[child]
+            pos[moved] = hole
+            hole = child
+            child = 2 * hole + 1
+        prio[hole] = x
+        items[hole] = item
+        pos[item] = hole
+
+    def push(self, item, priority):
+        if item in self._pos:
+            raise ValueError(f"{item!r} is already queued")
+        self._prio.append(priority)
+        self._items.append(item)
+        self._sift_up(len(self._items) - 1, item, priority)
+
+    def pop(self):
+        # Removes and returns (item, priority) with the highest priority
+        if not self._items:
+            raise IndexError("pop from an empty queue")
+        top = self._items[0], self._prio[0]
+        del self._pos[top[0]]
+        item = self._items.pop()
+        x = self._prio.pop()
+        if self._items:
+            self._sift_down(0, item, x, len(self._items))
+        return top
+
+    def increase_key(self, item, priority):
+        i = self._pos[item]
+        if priority < self._prio[i]:
+            raise ValueError(f"new priority {priority} is lower than {self._prio[i]}")
+        self._sift_up(i, item, priority)
+
+    def decrease_key(self, item, priority):
+        i = self._pos[item]
+        if priority > self._prio[i]:
+            raise ValueError(f"new priority {priority} is higher than {self._prio[i]}")
+        self._sift_down(i, item, priority, len(self._items))
+
+    def update(self, item, priority):
+        # Changes the priority in either direction
+        if priority < self._prio[self._pos[item]]:
+            self.decrease_key(item, priority)
+        else:
+            self.increase_key(item, priority)
+
+    def remove(self, item):
+        # Removes `item` from anywhere in the queue; returns its priority
+        i = self._pos.pop(item)
+        removed = self._prio[i]
+        last = self._items.pop()
+        x = self._prio.pop()
+        if i < len(self._items):
+            # The last entry fills the gap and moves whichever way it has to
+            if i > 0 and self._prio[(i - 1) >> 1] < x:
+                self._sift_up(i, last, x)
+            else:
+                self._sift_down(i, last, x, len(self._items))
+        return removed
+
+    # Event-emitting versions; each changes the queue exactly like the
+    # plain method as it is advanced
+
+    def _sift_up_events(self, hole, item, x):
+        prio = self._prio
+        start = hole
+        while hole > 0:
+            p = (hole - 1) >> 1
+            yield (COMPARE, p, hole)
+            if not prio[p] < x:
+                break
+            self._move(p, hole)
+            yield (WRITE, hole, prio[hole])
+            hole = p
+        # The item may stay put with a new priority, which is still a write
+        changed = hole != start or prio[hole] != x
+        self._place(hole, item, x)
+        if changed:
+            yield (WRITE, hole, x)
+
+    def _sift_down_events(self, hole, item, x, n):
+        prio = self._prio
+        start = hole
+        child = 2 * hole + 1
+        while child < n:
+            if child + 1 < n:
+                yield (COMPARE, child, child + 1)
+                if prio[child + 1] > prio[child]:
+                    child += 1
+            yield (COMPARE, hole, child)
+            if not prio[child] > x:
+                break
+            self._move(child, hole)
+            yield (WRITE, hole, prio[hole])
+            hole = child
+            child = 2 * hole + 1
+        changed = hole != start or prio[hole] != x
+        self._place(hole, item, x)
+        if changed:
+            yield (WRITE, hole, x)
+
+    def push_events(self, item, priority):
+        if item in self._pos:
+            raise ValueError(f"{item!r} is already queued")
+        self._prio.append(priority)
+        self._items.append(item)
+        self._pos[item] = len(self._items) - 1
+        yield (BOUNDARY, len(self._items), 0)
+        yield from self._sift_up_events(len(self._items) - 1, item, priority)
+
+    def pop_events(self):
+        if not self._items:
+            raise IndexError("pop from an empty queue")
+        top = self._items[0], self._prio[0]
+        del self._pos[top[0]]
+        item = self._items.pop()
+        x = self._prio.pop()
+        yield (BOUNDARY, len(self._items), 0)
+        if self._items:
+            yield from self._sift_down_events(0, item, x, len(self._items))
+        return top
+
+    def increase_key_events(self, item, priority):
+        i = self._pos[item]
+        if priority < self._prio[i]:
+            raise ValueError(f"new priority {priority} is lower than {self._prio[i]}")
+        yield from self._sift_up_events(i, item, priority)
+
+    def decrease_key_events(self, item, priority):
+        i = self._pos[item]
+        if priority > self._prio[i]:
+            raise ValueError(f"new priority {priority} is higher than {self._prio[i]}")
+        yield from self._sift_down_events(i, item, priority, len(self._items))
+
+    def remove_events(self, item):
+        i = self._pos.pop(item)
+        removed = self._prio[i]
+        last = self._items.pop()
+        x = self._prio.pop()
+        yield (BOUNDARY, len(self._items), 0)
+        if i < len(self._items):
+            self._place(i, last, x)
+            yield (WRITE, i, x)
+            if i > 0:
+                yield (COMPARE, (i - 1) >> 1, i)
+            if i > 0 and self._prio[(i - 1) >> 1] < x:
+                yield from self._sift_up_events(i, last, x)
+            else:
+                yield from self._sift_down_events(i, last, x, len(self._items))
+        return removed
+
+    def is_valid(self):
+        # Heap order and position map agree; for checks, O(n)
+        prio = self._prio
+        return (len(self._pos) == len(self._items) == len(prio)
+                and all(self._pos[item] == i for i, item in enumerate(self._items))
+                and all(not prio[(i - 1) >> 1] < prio[i] for i in range(1, len(prio))))
+
+
+class LazyHeap:
+    # heapq baseline with lazy deletion (the recipe from the heapq docs):
+    # an update pushes a new entry and marks the old one dead, and dead
+    # entries are skipped when they reach the top. Priorities are negated
+    # because heapq is a min-heap.
+    __slots__ = ("_heap", "_entries", "_counter")
+
+    _REMOVED = object()
+
+    def __init__(self, pairs=()):
+        self._counter = itertools.count()
+        self._entries = {}
+        self._heap = []
+        for item, priority in pairs:
+            entry = [-priority, next(self._counter), item]
+            self._entries[item] = entry
+            self._heap.append(entry)
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def storage(self):
+        # Heap entries including the dead ones
+        return len(self._heap)
+
+    def push(self, item, priority):
+        entry = [-priority, next(self._counter), item]
+        self._entries[item] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, item):
+        entry = self._entries.pop(item)
+        entry[2] = self._REMOVED
+        return -entry[0]
+
+    def update(self, item, priority):
+        self.remove(item)
+        self.push(item, priority)
+
+    def pop(self):
+        heap = self._heap
+        while heap:
+            priority, _, item = heapq.heappop(heap)
+            if item is not self._REMOVED:
+                del self._entries[item]
+                return item, -priority
+        raise IndexError("pop from an empty queue")
+
+
+# Benchmark
+
+OPERATIONS = ("pop", "update", "remove")
+
+
+def make_workload(n, ops, seed=0):
+    # n initial items and a script of `ops` operations. Which item an update
+    # or remove hits is decided during the replay, since it depends on what
+    # earlier pops took out. Every pop and remove is followed by a push, so
+    # the queue keeps its size. Priorities are unique (random high bits, a
+    # serial number below them), so both queues pop the same items.
+    rng = random.Random(f"{seed}-pq-{n}-{ops}")
+    serial = itertools.count()
+
+    def priority():
+        return (rng.randrange(1 << 28) << 24) | next(serial)
+
+    initial = [(i, priority()) for i in range(n)]
+    script = []
+    next_item = n
+    for _ in range(ops):
+        op = rng.choice(OPERATIONS)
+        script.append((op, None, priority()))
+        if op != "update":
+            script.append(("push", next_item, priority()))
+            next_item += 1
+    return initial, script
+
+
+def _replay(queue, script, seed, track=False):
+    # Returns the largest heap storage seen when `track` is set
+    rng = random.Random(seed)
+    live = list(range(len(queue)))
+    index = {item: i for i, item in enumerate(live)}
+    peak = 0
+
+    def drop(item):
+        i = index.pop(item)
+        last = live.pop()
+        if last != item:
+            live[i] = last
+            index[last] = i
+
+    for op, item, priority in script:
+        if op == "push":
+            queue.push(item, priority)
+            index[item] = len(live)
+            live.append(item)
+        elif op == "pop":
+            drop(queue.pop()[0])
+        else:
+            target = live[rng.randrange(len(live))]
+            if op == "update":
+                queue.update(target, priority)
+            else:
+                queue.remove(target)
+                drop(target)
+        if track:
+            peak = max(peak, queue.storage())
+    return peak
+
+
+def benchmark(n, ops, seed=0, typecode=None):
+    # Times the same operation script on IndexedHeap and on LazyHeap
+    initial, script = make_workload(n, ops, seed)
+
+    start = time.perf_counter()
+    indexed = IndexedHeap(initial, typecode)
+    _replay(indexed, script, seed)
+    indexed_time = time.perf_counter() - start
+    if not indexed.is_valid():
+        raise AssertionError("IndexedHeap lost the heap property")
+
+    start = time.perf_counter()
+    lazy = LazyHeap(initial)
+    _replay(lazy, script, seed)
+    lazy_time = time.perf_counter() - start
+
+    if [indexed.pop() for _ in range(len(indexed))] != [lazy.pop() for _ in range(len(lazy))]:
+        raise AssertionError("queues disagree")
+    # Untimed rerun to see how many dead entries lazy deletion carries
+    peak = _replay(LazyHeap(initial), script, seed, track=True)
+    return {
+        "n": n,
+        "operations": ops,
+        "indexed_time": indexed_time,
+        "lazy_time": lazy_time,
+        "lazy_peak_entries": peak,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IndexedHeap vs heapq with lazy deletion")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10 ** 3, 10 ** 4, 10 ** 5])
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--typecode", choices=["q", "d"], help="array storage for priorities")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>9} {'ops':>9} {'indexed (s)':>12} {'heapq lazy (s)':>15} {'lazy peak':>10}")
+    for n in args.sizes:
+        r = benchmark(n, args.ops, args.seed, args.typecode)
+        print(f"{r['n']:>9} {r['operations']:>9} {r['indexed_time']:>12.3f} "
+              f"{r['lazy_time']:>15.3f} {r['lazy_peak_entries']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import csv
+import struct
+from array import array
+from collections import deque
+
+import sorting_engine
+
+# Sorting of record data by one or more columns with any engine algorithm.
+#
+# Keys are decorated once: every sort column is rank-encoded (its distinct
+# values in order, reversed for descending columns), the ranks are packed
+# into one integer per record, and the record's index is appended as the
+# lowest digit. The engine then sorts that compact array of integers, so
+# comparisons never touch the records, and since every key is unique the
+# resulting order is stable even for algorithms that are not. The result
+# is an argsort permutation; records are only moved when it is applied.
+#
+# CSV records are kept as the raw strings that were read, so writing them
+# back reproduces every cell exactly; only the sort columns are converted,
+# and only for building the keys.
+
+
+def _column_keys(values):
+    # Text columns whose filled cells all parse as numbers compare as
+    # numbers, anything else as text. Blank cells do not decide the type;
+    # they map to None and sort after every value, in either direction.
+    if not all(isinstance(v, str) for v in values):
+        return list(values)
+    filled = {v for v in values if v.strip()}
+    for kind in (int, float):
+        try:
+            table = {v: kind(v) for v in filled}
+            break
+        except ValueError:
+            pass
+    else:
+        table = {v: v for v in filled}
+    return [table.get(v) for v in values]
+
+
+def load_csv(path, delimiter=","):
+    # Returns (field names, list of record tuples of the raw cell strings);
+    # the first row is the header
+    with open(path, newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        fields = next(reader)
+        rows = [tuple(row) for row in reader if row]
+    return fields, rows
+
+
+def load_binary(path, fmt, fields):
+    # Fixed-width records described by a struct format, e.g. "<iqd"
+    record = struct.Struct(fmt)
+    if len(record.unpack(bytes(record.size))) != len(fields):
+        raise ValueError(f"Format {fmt!r} does not have {len(fields)} fields")
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) % record.size:
+        raise ValueError(f"{path} is not a whole number of {record.size}-byte records")
+    return list(fields), list(record.iter_unpack(data))
+
+
+def _parse_key(key, fields):
+    # "name" or "name:asc" sorts ascending, "name:desc" descending;
+    # plain column indices work too
+    descending = False
+    if isinstance(key, str):
+        key, _, order = key.partition(":")
+        if order not in ("", "asc", "desc"):
+            raise ValueError(f"Unknown sort order: {order}")
+        descending = order == "desc"
+        if key not in fields:
+            raise ValueError(f"Unknown column: {key}")
+        key = fields.index(key)
+    return key, descending
+
+
+def decorate(records, keys, fields=()):
+    # Builds the packed integer keys; returns (keys, index digit base)
+    n = len(records)
+    packed = [0] * n
+    for key in keys:
+        column, descending = _parse_key(key, fields)
+        # Short CSV rows have blank trailing cells
+        values = _column_keys([r[column] if column < len(r) else "" for r in records])
+        distinct = sorted(set(values) - {None})
+        base = len(distinct) + 1
+        if descending:
+            ranks = {v: len(distinct) - 1 - i for i, v in enumerate(distinct)}
+        else:
+            ranks = {v: i for i, v in enumerate(distinct)}
+        ranks[None] = len(distinct)
+        packed = [p * base + ranks[v] for p, v in zip(packed, values)]
+    return [p * n + i for i, p in enumerate(packed)], n
+
+
+def sort_records(records, keys, fields=(), algorithm="intro", stats=None):
+    # Returns the permutation that orders `records` by `keys`
+    n = len(records)
+    if n == 0:
+        return []
+    decorated, base = decorate(records, keys, fields)
+    # Packed keys are stored compactly whenever they fit a machine word
+    if max(decorated) < 1 << 63:
+        decorated = array('q', decorated)
+    events = sorting_engine.sort_events(decorated, algorithm)
+    if stats is not None:
+        stats.consume(events)
+    else:
+        deque(events, maxlen=0)
+    return [k % base for k in decorated]
+
+
+def apply_permutation(records, permutation):
+    return [records[i] for i in permutation]
+
+
+def write_csv(path, fields, records, delimiter=","):
+    with open(path, 'w', newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(fields)
+        writer.writerows(records)
+
+
+def write_binary(path, fmt, records):
+    record = struct.Struct(fmt)
+    with open(path, 'wb') as f:
+        for r in records:
+            f.write(record.pack(*r))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sort CSV or binary records by columns")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--by", nargs="+", required=True,
+                        help="sort columns, e.g. --by city age:desc")
+    parser.add_argument("--algorithm", choices=list(sorting_engine.ALGORITHMS) + [sorting_engine.AUTO],
+                        default="intro")
+    parser.add_argument("--struct", help="struct format of binary records, e.g. '<iqd'")
+    parser.add_argument("--fields", nargs="+", help="field names for binary records")
+    parser.add_argument("--delimiter", default=",")
+    args = parser.parse_args(argv)
+
+    if args.struct:
+        if not args.fields:
+            parser.error("--fields is required with --struct")
+        fields, records = load_binary(args.input, args.struct, args.fields)
+    else:
+        fields, records = load_csv(args.input, args.delimiter)
+
+    stats = sorting_engine.SortStats()
+    permutation = sort_records(records, args.by, fields, args.algorithm, stats)
+    ordered = apply_permutation(records, permutation)
+
+    if args.struct:
+        write_binary(args.output, args.struct, ordered)
+    else:
+        write_csv(args.output, fields, ordered, args.delimiter)
+    print(f"Sorted {len(records)} records by {', '.join(args.by)}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
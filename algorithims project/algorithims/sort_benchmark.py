@@ -0,0 +1,203 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone
+
+import sorting_engine
+
+DISTRIBUTIONS = ["random", "sorted", "reversed", "few_unique", "nearly_sorted",
+                 "sawtooth", "organ_pipe"]
+QUADRATIC = ("bubble", "selection", "insertion")
+# Sorts that are only quadratic on some inputs. The engine's quick sort is
+# Lomuto with a last-element pivot, so presorted runs and repeated values
+# make every partition lopsided; it still runs at every size on "random".
+QUADRATIC_ON = {
+    "quick": ("sorted", "reversed", "few_unique", "nearly_sorted", "sawtooth", "organ_pipe"),
+}
+
+
+def make_input(distribution, n, seed=0):
+    # Same (distribution, n, seed) always gives the same list, on any machine
+    rng = random.Random(f"{seed}-{distribution}-{n}")
+
+    if distribution == "random":
+        return [rng.randrange(n) for _ in range(n)]
+    if distribution == "sorted":
+        return list(range(n))
+    if distribution == "reversed":
+        return list(range(n, 0, -1))
+    if distribution == "few_unique":
+        return [rng.randrange(8) for _ in range(n)]
+    if distribution == "nearly_sorted":
+        data = list(range(n))
+        for _ in range(max(1, n // 100)):
+            i = rng.randrange(n)
+            j = rng.randrange(n)
+            data[i], data[j] = data[j], data[i]
+        return data
+    if distribution == "sawtooth":
+        tooth = max(2, int(n ** 0.5))
+        return [i % tooth for i in range(n)]
+    if distribution == "organ_pipe":
+        half = n // 2
+        return list(range(half)) + list(range(n - half, 0, -1))
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+
+def run_case(algorithm, distribution, n, seed, repeat=1):
+    data = make_input(distribution, n, seed)
+
+    # Timed runs: events are drained without being inspected; best of
+    # `repeat` is reported
+    wall_time = None
+    for _ in range(repeat):
+        a = data[:]
+        start = time.perf_counter()
+        deque(sorting_engine.sort_events(a, algorithm), maxlen=0)
+        elapsed = time.perf_counter() - start
+        if wall_time is None or elapsed < wall_time:
+            wall_time = elapsed
+    if a != sorted(data):
+        raise AssertionError(f"{algorithm} failed on {distribution} n={n}")
+
+    # Counted run under tracemalloc; its timing is not reported
+    a = data[:]
+    stats = sorting_engine.SortStats()
+    tracemalloc.start()
+    stats.consume(sorting_engine.sort_events(a, algorithm))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "algorithm": algorithm,
+        "distribution": distribution,
+        "n": n,
+        "seed": seed,
+        "wall_time": wall_time,
+        "peak_memory": peak,
+    }
+    result.update(stats.as_dict())
+    return result
+
+
+def is_skipped(algorithm, distribution, n, quadratic_limit):
+    # Cases that would run in O(n^2) above the limit
+    if n <= quadratic_limit:
+        return False
+    return algorithm in QUADRATIC or distribution in QUADRATIC_ON.get(algorithm, ())
+
+
+def run_benchmark(algorithms, distributions, sizes, seed=0, quadratic_limit=5000,
+                  repeat=1, progress=None):
+    results = []
+    for n in sizes:
+        for distribution in distributions:
+            for algorithm in algorithms:
+                if is_skipped(algorithm, distribution, n, quadratic_limit):
+                    continue
+                result = run_case(algorithm, distribution, n, seed, repeat)
+                results.append(result)
+                if progress:
+                    progress(result)
+    return results
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def skipped_cases(algorithms, distributions, sizes, quadratic_limit):
+    # Groups the skipped cases as {algorithm: [distributions]} for the summary
+    skipped = {}
+    for algorithm in algorithms:
+        names = [d for d in distributions
+                 if any(is_skipped(algorithm, d, n, quadratic_limit) for n in sizes)]
+        if names:
+            skipped[algorithm] = names
+    return skipped
+
+
+def format_table(results):
+    header = f"{'algorithm':<10} {'distribution':<14} {'n':>9} {'time (s)':>10} " \
+             f"{'compares':>12} {'swaps':>11} {'writes':>11} {'aux':>9} {'depth':>5} " \
+             f"{'peak KiB':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(f"{r['algorithm']:<10} {r['distribution']:<14} {r['n']:>9} "
+                     f"{r['wall_time']:>10.4f} {r['comparisons']:>12} {r['swaps']:>11} "
+                     f"{r['writes']:>11} {r['aux_memory']:>9} {r['max_depth']:>5} "
+                     f"{r['peak_memory'] // 1024:>9}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the headless sorting engine")
+    parser.add_argument("--algorithms", nargs="+", default=list(sorting_engine.ALGORITHMS),
+                        choices=list(sorting_engine.ALGORITHMS))
+    parser.add_argument("--distributions", nargs="+", default=DISTRIBUTIONS,
+                        choices=DISTRIBUTIONS)
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        help="explicit sizes; overrides --max-exp")
+    parser.add_argument("--max-exp", type=int, default=5, choices=range(2, 8),
+                        help="run sizes 10^2 .. 10^MAX_EXP (default 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="timed runs per case; the fastest is reported")
+    parser.add_argument("--quadratic-limit", type=int, default=5000,
+                        help="skip O(n^2) sorts, and quick sort on the inputs that "
+                             "make it O(n^2), above this size")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or [10 ** e for e in range(2, args.max_exp + 1)]
+
+    def progress(r):
+        print(f"[INFO] {r['algorithm']} {r['distribution']} n={r['n']}: "
+              f"{r['wall_time']:.4f}s", file=sys.stderr)
+
+    skipped = skipped_cases(args.algorithms, args.distributions, sizes, args.quadratic_limit)
+    results = run_benchmark(args.algorithms, args.distributions, sizes,
+                            seed=args.seed, quadratic_limit=args.quadratic_limit,
+                            repeat=args.repeat, progress=progress)
+
+    report = {
+        "environment": environment(),
+        "config": {
+            "algorithms": args.algorithms,
+            "distributions": args.distributions,
+            "sizes": sizes,
+            "seed": args.seed,
+            "quadratic_limit": args.quadratic_limit,
+            "repeat": args.repeat,
+            "skipped_above_limit": skipped,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    summary = sys.stderr if not args.output else sys.stdout
+    print(format_table(results), file=summary)
+    for algorithm, names in skipped.items():
+        print(f"Skipped above n={args.quadratic_limit} (O(n^2)): {algorithm} on "
+              f"{', '.join(names)}", file=summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import time
+
+import sorting_engine
+from sorting_engine import COMPARE, SWAP, WRITE, SortStats
+
+# Runs several sorting algorithms side by side on copies of the same input.
+# Every round each unfinished lane is advanced by the same budget, either a
+# number of work units (compare/swap/write events) or a slice of wall-clock
+# time, so the lanes progress under identical load.
+
+MODES = ("ops", "time")
+
+
+class RaceLane:
+    __slots__ = ("name", "array", "events", "stats", "elapsed", "done", "finish_round")
+
+    def __init__(self, name, data):
+        self.name = name
+        self.array = list(data)
+        self.events = sorting_engine.sort_events(self.array, name)
+        self.stats = SortStats()
+        self.elapsed = 0.0
+        self.done = False
+        self.finish_round = None
+
+    @property
+    def work(self):
+        st = self.stats
+        return st.comparisons + st.swaps + st.writes
+
+
+class SortRace:
+    def __init__(self, data, algorithms, mode="ops", quantum=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown race mode: {mode}")
+        self.mode = mode
+        # Work units per lane per round, or seconds per lane per round
+        self.quantum = quantum or (32 if mode == "ops" else 0.002)
+        self.lanes = [RaceLane(name, data) for name in algorithms]
+        self.rounds = 0
+
+    @property
+    def done(self):
+        return all(lane.done for lane in self.lanes)
+
+    def _advance(self, lane, applied):
+        # Runs one lane for one quantum; changed events go to `applied`
+        record = lane.stats.record
+        events = lane.events
+        ops_mode = self.mode == "ops"
+        budget = self.quantum
+        clock = time.perf_counter
+        start = clock()
+        units = 0
+
+        for event in events:
+            record(event)
+            op = event[0]
+            if op == SWAP or op == WRITE:
+                applied.append(event)
+            elif op != COMPARE:
+                continue
+            units += 1
+            if ops_mode:
+                if units >= budget:
+                    break
+            elif units % 64 == 0 and clock() - start >= budget:
+                break
+        else:
+            lane.done = True
+            lane.finish_round = self.rounds
+
+        lane.elapsed += clock() - start
+
+    def step(self):
+        # Advances every unfinished lane once; returns {lane index: events}
+        self.rounds += 1
+        changes = {}
+        for i, lane in enumerate(self.lanes):
+            if not lane.done:
+                applied = []
+                self._advance(lane, applied)
+                changes[i] = applied
+        return changes
+
+    def run(self):
+        while not self.done:
+            self.step()
+        return self.ranking()
+
+    def ranking(self):
+        key = (lambda lane: lane.work) if self.mode == "ops" else (lambda lane: lane.elapsed)
+        finished = [lane for lane in self.lanes if lane.done]
+        return sorted(finished, key=lambda lane: (lane.finish_round, key(lane)))
+
+    def format_ranking(self):
+        header = f"{'#':>2} {'algorithm':<10} {'time (ms)':>10} {'work':>10} " \
+                 f"{'compares':>10} {'swaps':>9} {'writes':>9}"
+        lines = [header, "-" * len(header)]
+        for rank, lane in enumerate(self.ranking(), 1):
+            st = lane.stats
+            lines.append(f"{rank:>2} {lane.name:<10} {lane.elapsed * 1000:>10.2f} {lane.work:>10} "
+                         f"{st.comparisons:>10} {st.swaps:>9} {st.writes:>9}")
+        return "\n".join(lines)
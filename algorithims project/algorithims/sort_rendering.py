@@ -0,0 +1,301 @@
+import tkinter as tk
+import time
+import queue
+from collections import deque
+
+
+class FrameTimer:
+    # Tracks repaint timestamps so renderers can report a live frame rate
+    def __init__(self):
+        self.frame_times = deque(maxlen=60)
+
+    def _tick(self):
+        self.frame_times.append(time.perf_counter())
+
+    @property
+    def fps(self):
+        # Frames per second over the most recent repaints
+        if len(self.frame_times) < 2:
+            return 0.0
+        elapsed = self.frame_times[-1] - self.frame_times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self.frame_times) - 1) / elapsed
+
+
+class BarRenderer(FrameTimer):
+    # Draws an array as bars on a Tk canvas. The rectangles are created
+    # once per array and then moved/recoloured in place. Callers mark the
+    # indices whose values changed and pass the set of highlighted indices;
+    # a repaint only touches bars that were marked or whose highlight state
+    # differs from the previous frame, so its cost does not depend on n.
+    def __init__(self, canvas, width, height, max_bar_height=350,
+                 default_color='#3498db', highlight_color='#e74c3c', tag="bars", y=0):
+        super().__init__()
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.y = y  # top edge, so several renderers can share one canvas
+        self.max_bar_height = max_bar_height
+        self.default_color = default_color
+        self.highlight_color = highlight_color
+        self.tag = tag
+
+        self.array = None
+        self.items = []
+        self.colors = []
+        self.dirty = set()
+        self.highlighted = set()
+        self.bar_width = 0
+        self.max_val = 1
+
+    def __len__(self):
+        return len(self.items)
+
+    def _bar_coords(self, i, value):
+        bottom = self.y + self.height
+        x0 = i * self.bar_width
+        y0 = bottom - (value / self.max_val * self.max_bar_height)
+        x1 = (i + 1) * self.bar_width - 2
+        return x0, y0, x1, bottom
+
+    def clear(self):
+        self.canvas.delete(self.tag)
+        self.array = None
+        self.items = []
+        self.colors = []
+        self.dirty = set()
+        self.highlighted = set()
+
+    def reset(self, array):
+        self.clear()
+        self.frame_times.clear()
+
+        if not array:
+            return
+
+        self.array = array
+        self.bar_width = self.width / len(array)
+        self.max_val = max(array) or 1
+
+        color = self.default_color
+        for i, value in enumerate(array):
+            item = self.canvas.create_rectangle(*self._bar_coords(i, value),
+                                                fill=color, outline='', tags=self.tag)
+            self.items.append(item)
+            self.colors.append(color)
+
+    def mark(self, index):
+        self.dirty.add(index)
+
+    def invalidate(self):
+        # Next repaint redraws every bar, e.g. after the array was replaced
+        self.dirty = set(range(len(self.items)))
+
+    def highlight(self, indices):
+        indices = set(indices)
+        # Only bars entering or leaving the highlight need a new colour
+        self.dirty |= self.highlighted ^ indices
+        self.highlighted = indices
+
+    def repaint(self, color=None):
+        if self.array is None:
+            return
+
+        canvas = self.canvas
+        items = self.items
+        colors = self.colors
+        array = self.array
+
+        if color is not None:
+            # Whole-array recolour, e.g. the final "sorted" frame
+            self.dirty = set(range(len(items)))
+
+        for i in self.dirty:
+            canvas.coords(items[i], *self._bar_coords(i, array[i]))
+            if color is not None:
+                fill = color
+            elif i in self.highlighted:
+                fill = self.highlight_color
+            else:
+                fill = self.default_color
+            if colors[i] != fill:
+                colors[i] = fill
+                canvas.itemconfig(items[i], fill=fill)
+
+        self.dirty.clear()
+        self._tick()
+
+
+class ColumnRenderer(FrameTimer):
+    # Renders very large arrays by binning indices into pixel columns of a
+    # single PhotoImage. Each column shows the largest value in its bin.
+    # Writes only mark their column dirty, and a repaint recomputes and
+    # redraws the dirty columns alone, so its cost is bounded by the canvas
+    # width rather than by the array length.
+    def __init__(self, canvas, width, height, max_bar_height=350,
+                 default_color='#3498db', highlight_color='#e74c3c',
+                 background='#1a1a2e', tag="columns"):
+        super().__init__()
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.max_bar_height = max_bar_height
+        self.default_color = default_color
+        self.highlight_color = highlight_color
+        self.background = background
+        self.tag = tag
+
+        self.array = None
+        self.image = None
+        self.n = 0
+        self.columns = 0
+        self.bounds = []
+        self.heights = []
+        self.colors = []
+        self.dirty = set()
+        self.highlighted = set()
+
+    def clear(self):
+        self.canvas.delete(self.tag)
+        self.array = None
+        self.image = None
+        self.n = 0
+        self.columns = 0
+
+    def reset(self, array):
+        self.clear()
+        if not array:
+            return
+
+        self.array = array
+        self.n = n = len(array)
+        self.columns = columns = min(self.width, n)
+        # Column c covers indices [bounds[c], bounds[c+1]); this matches
+        # index * columns // n used by mark()
+        self.bounds = [(c * n + columns - 1) // columns for c in range(columns + 1)]
+        self.max_val = max(array) or 1
+        self.heights = [-1] * columns
+        self.colors = [None] * columns
+        self.dirty = set(range(columns))
+        self.highlighted = set()
+
+        self.image = tk.PhotoImage(width=columns, height=self.height)
+        self.image.put(self.background, to=(0, 0, columns, self.height))
+        self.canvas.create_image(0, 0, image=self.image, anchor=tk.NW, tags=self.tag)
+
+    def mark(self, index):
+        self.dirty.add(index * self.columns // self.n)
+
+    def invalidate(self):
+        self.dirty = set(range(self.columns))
+
+    def highlight(self, indices):
+        columns = {i * self.columns // self.n for i in indices}
+        self.dirty |= self.highlighted
+        self.dirty |= columns
+        self.highlighted = columns
+
+    def repaint(self, color=None):
+        if self.image is None:
+            return
+
+        array = self.array
+        bounds = self.bounds
+        heights = self.heights
+        colors = self.colors
+        put = self.image.put
+        scale = self.max_bar_height / self.max_val
+        bottom = self.height
+
+        if color is not None:
+            self.dirty = set(range(self.columns))
+
+        for c in self.dirty:
+            h = int(max(array[bounds[c]:bounds[c + 1]]) * scale)
+            if color is not None:
+                fill = color
+            elif c in self.highlighted:
+                fill = self.highlight_color
+            else:
+                fill = self.default_color
+
+            if h != heights[c] or fill != colors[c]:
+                put(self.background, to=(c, 0, c + 1, bottom))
+                if h > 0:
+                    put(fill, to=(c, bottom - h, c + 1, bottom))
+                heights[c] = h
+                colors[c] = fill
+
+        self.dirty.clear()
+        self._tick()
+
+
+class RenderScheduler:
+    # Main-thread render loop. Worker threads post events to a thread-safe
+    # queue; every frame the loop drains the queue, applies all pending
+    # events and repaints at most once. Callables posted to the queue are
+    # run on the main thread in order, which lets workers hand back
+    # completion work without touching Tk themselves. Lists are treated as
+    # batches of events. With max_pending set, post() blocks the worker
+    # once that many items are waiting, so a fast sort cannot outrun the
+    # display by an unbounded amount of memory.
+    def __init__(self, root, apply_event, repaint, fps=60, max_pending=0):
+        self.root = root
+        self.apply_event = apply_event
+        self.repaint = repaint
+        self.fps = fps
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.running = False
+        self._after_id = None
+
+    def post(self, event):
+        self.queue.put(event)
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self._after_id = self.root.after(0, self._tick)
+
+    def stop(self):
+        self.running = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def clear(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _tick(self):
+        get = self.queue.get_nowait
+        apply_event = self.apply_event
+        dirty = False
+
+        while True:
+            try:
+                event = get()
+            except queue.Empty:
+                break
+            if callable(event):
+                if dirty:
+                    self.repaint()
+                    dirty = False
+                event()
+            elif type(event) is list:
+                for e in event:
+                    apply_event(e)
+                dirty = True
+            else:
+                apply_event(event)
+                dirty = True
+
+        if dirty:
+            self.repaint()
+
+        if self.running:
+            frame_ms = max(1, int(1000 / max(1, self.fps)))
+            self._after_id = self.root.after(frame_ms, self._tick)
@@ -0,0 +1,165 @@
+import mmap
+import struct
+from array import array
+
+from sorting_engine import SWAP, WRITE, sort_events
+
+# Binary trace of a sort run.
+#
+# Layout:
+#   header      MAGIC, version, checkpoint interval K, array length n
+#   block 0     checkpoint (n int64 values), then K event records
+#   block 1     checkpoint, then K event records
+#   ...         the last block may hold fewer than K records
+#
+# Every block has the same size, so the byte offset of any step is computed
+# directly and no index is needed. An event record is (op, a, b, old):
+# `old` is the value a WRITE replaced, which makes every event reversible
+# and lets the player step backwards without re-running anything.
+
+MAGIC = b'SRTR'
+VERSION = 1
+HEADER = struct.Struct('<4sHIQ')
+RECORD = struct.Struct('<Biqq')
+VALUE = 'q'
+
+
+class TraceRecorder:
+    def __init__(self, path, array_data, checkpoint_interval=None):
+        n = len(array_data)
+        # Checkpoints cost 8 bytes per element, so by default they are only
+        # taken every max(4096, n) events to keep them below 8 bytes/event
+        self.interval = checkpoint_interval or max(4096, n)
+        self.shadow = list(array_data)
+        self.count = 0
+        self.file = open(path, 'wb', buffering=1 << 20)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.interval, n))
+        self._checkpoint()
+
+    def _checkpoint(self):
+        self.file.write(array(VALUE, self.shadow).tobytes())
+
+    def record(self, event):
+        if self.count and self.count % self.interval == 0:
+            self._checkpoint()
+
+        op, a, b = event
+        old = 0
+        shadow = self.shadow
+        if op == SWAP:
+            shadow[a], shadow[b] = shadow[b], shadow[a]
+        elif op == WRITE:
+            old = shadow[a]
+            shadow[a] = b
+        self.file.write(RECORD.pack(op, a, b, old))
+        self.count += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_sort(path, data, algorithm="intro", checkpoint_interval=None, **options):
+    # Runs `algorithm` headless and writes its full event stream to `path`
+    a = list(data)
+    with TraceRecorder(path, a, checkpoint_interval) as recorder:
+        record = recorder.record
+        for event in sort_events(a, algorithm, **options):
+            record(event)
+    return a
+
+
+class TracePlayer:
+    # Random-access replay of a trace file. `position` is the number of
+    # events applied to `array`. Stepping in either direction is O(1);
+    # seek() costs at most one checkpoint load plus K event applications.
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.interval, self.n = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a sort trace (version {VERSION})")
+
+        self.checkpoint_size = self.n * struct.calcsize(VALUE)
+        self.block_size = self.checkpoint_size + self.interval * RECORD.size
+
+        body = len(self.data) - HEADER.size
+        full_blocks, rest = divmod(body, self.block_size)
+        tail = max(0, rest - self.checkpoint_size) // RECORD.size
+        self.length = full_blocks * self.interval + tail
+
+        self.array = []
+        self.position = 0
+        self._load_checkpoint(0)
+
+    def _load_checkpoint(self, block):
+        start = HEADER.size + block * self.block_size
+        values = array(VALUE)
+        values.frombytes(self.data[start:start + self.checkpoint_size])
+        self.array[:] = values.tolist()
+        self.position = block * self.interval
+
+    def event(self, step):
+        # Raw record for `step`: (op, a, b, old)
+        block, offset = divmod(step, self.interval)
+        pos = HEADER.size + block * self.block_size + self.checkpoint_size + offset * RECORD.size
+        return RECORD.unpack_from(self.data, pos)
+
+    def _apply(self, record):
+        op, a, b, _ = record
+        if op == SWAP:
+            self.array[a], self.array[b] = self.array[b], self.array[a]
+        elif op == WRITE:
+            self.array[a] = b
+
+    def _undo(self, record):
+        op, a, b, old = record
+        if op == SWAP:
+            self.array[a], self.array[b] = self.array[b], self.array[a]
+        elif op == WRITE:
+            self.array[a] = old
+
+    def step_forward(self):
+        if self.position >= self.length:
+            return None
+        record = self.event(self.position)
+        self._apply(record)
+        self.position += 1
+        return record
+
+    def step_backward(self):
+        if self.position <= 0:
+            return None
+        self.position -= 1
+        record = self.event(self.position)
+        self._undo(record)
+        return record
+
+    def seek(self, step):
+        step = max(0, min(step, self.length))
+        last_block = max(0, (self.length - 1) // self.interval)
+        block = min(step // self.interval, last_block)
+        # Reload a checkpoint unless `step` is ahead of us in the same block
+        if not (block * self.interval <= self.position <= step):
+            self._load_checkpoint(block)
+        while self.position < step:
+            self._apply(self.event(self.position))
+            self.position += 1
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,681 @@
+import math
+from array import array
+from collections import deque
+
+from presortedness import recommend
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Event opcodes yielded by every sorting generator.
+# Each event is a tuple (op, a, b):
+#   (COMPARE, i, j)   - array[i] was compared with array[j]
+#   (SWAP, i, j)      - array[i] and array[j] were exchanged
+#   (WRITE, k, value) - array[k] was overwritten with value
+#   (DEPTH, d, 0)     - a recursive call at depth d was entered
+#   (ALLOC, k, 0)     - k auxiliary element slots were allocated
+#                       (negative k when they are released)
+#   (BOUNDARY, k, 0)  - heap sort: the heap now ends at k, a[k:] is sorted
+# DEPTH, ALLOC and BOUNDARY are emitted once per call/buffer/extraction,
+# never per element, and renderers can ignore them.
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+DEPTH = 3
+ALLOC = 4
+BOUNDARY = 5
+
+
+class SortStats:
+    # Operation counters filled from an event stream. Nothing is counted
+    # unless a stats object is attached, so plain sort() pays no cost.
+    __slots__ = ("comparisons", "swaps", "writes", "aux_memory", "max_depth", "_aux")
+
+    def __init__(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.aux_memory = 0  # peak auxiliary element slots in use
+        self.max_depth = 0
+        self._aux = 0
+
+    def record(self, event):
+        op, a, _ = event
+        if op == COMPARE:
+            self.comparisons += 1
+        elif op == SWAP:
+            self.swaps += 1
+        elif op == WRITE:
+            self.writes += 1
+        elif op == DEPTH:
+            if a > self.max_depth:
+                self.max_depth = a
+        elif op == ALLOC:
+            self._aux += a
+            if self._aux > self.aux_memory:
+                self.aux_memory = self._aux
+
+    def consume(self, events):
+        # Drains `events`, counting as it goes; locals keep the loop tight
+        comparisons = swaps = writes = 0
+        record = self.record
+        for event in events:
+            op = event[0]
+            if op == COMPARE:
+                comparisons += 1
+            elif op == SWAP:
+                swaps += 1
+            elif op == WRITE:
+                writes += 1
+            else:
+                record(event)
+        self.comparisons += comparisons
+        self.swaps += swaps
+        self.writes += writes
+
+    def as_dict(self):
+        return {
+            "comparisons": self.comparisons,
+            "swaps": self.swaps,
+            "writes": self.writes,
+            "aux_memory": self.aux_memory,
+            "max_depth": self.max_depth,
+        }
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v}" for k, v in self.as_dict().items())
+        return f"SortStats({fields})"
+
+
+def bubble_sort(a):
+    n = len(a)
+    for i in range(n):
+        for j in range(0, n-i-1):
+            yield (COMPARE, j, j+1)
+            if a[j] > a[j+1]:
+                a[j], a[j+1] = a[j+1], a[j]
+                yield (SWAP, j, j+1)
+
+
+def selection_sort(a):
+    n = len(a)
+    for i in range(n):
+        min_idx = i
+        for j in range(i+1, n):
+            yield (COMPARE, j, min_idx)
+            if a[j] < a[min_idx]:
+                min_idx = j
+
+        a[i], a[min_idx] = a[min_idx], a[i]
+        yield (SWAP, i, min_idx)
+
+
+def insertion_sort(a):
+    n = len(a)
+    for i in range(1, n):
+        key = a[i]
+        j = i-1
+        while j >= 0:
+            yield (COMPARE, i, j)
+            if not key < a[j]:
+                break
+            a[j+1] = a[j]
+            yield (WRITE, j+1, a[j])
+            j -= 1
+        a[j+1] = key
+        yield (WRITE, j+1, key)
+
+
+def quick_sort(a, low=0, high=None, depth=1):
+    if high is None:
+        high = len(a) - 1
+    yield (DEPTH, depth, 0)
+    # Recurse into the smaller side and loop on the larger one so the
+    # stack stays O(log n) even when partitions are lopsided
+    while low < high:
+        pi = yield from partition(a, low, high)
+        if pi - low < high - pi:
+            yield from quick_sort(a, low, pi-1, depth + 1)
+            low = pi + 1
+        else:
+            yield from quick_sort(a, pi+1, high, depth + 1)
+            high = pi - 1
+
+
+def partition(a, low, high):
+    pivot = a[high]
+    i = low - 1
+
+    for j in range(low, high):
+        yield (COMPARE, j, high)
+        if a[j] <= pivot:
+            i += 1
+            a[i], a[j] = a[j], a[i]
+            yield (SWAP, i, j)
+
+    a[i+1], a[high] = a[high], a[i+1]
+    yield (SWAP, i+1, high)
+
+    return i + 1
+
+
+def merge_sort(a):
+    # Bottom-up natural merge sort. Runs that are already ascending are
+    # detected up front; each pass merges neighbouring runs from one buffer
+    # into the other, ping-ponging between `a` and a single auxiliary list
+    # allocated once. Write events are only emitted for writes into `a`.
+    n = len(a)
+    if n < 2:
+        return
+
+    runs = array('l', [0])
+    for i in range(1, n):
+        yield (COMPARE, i-1, i)
+        if a[i] < a[i-1]:
+            runs.append(i)
+    runs.append(n)
+    if len(runs) == 2:
+        return
+
+    aux = a[:]
+    # The run list shrinks as passes merge, so release what was counted here
+    allocated = n + len(runs)
+    yield (ALLOC, allocated, 0)
+    src, dst = a, aux
+    while len(runs) > 2:
+        emit = dst is a
+        kept = 1
+        for r in range(0, len(runs) - 1, 2):
+            lo = runs[r]
+            if r + 2 < len(runs):
+                mid = runs[r+1]
+                hi = runs[r+2]
+                yield from merge(src, dst, lo, mid, hi, emit)
+            else:
+                hi = runs[r+1]
+                yield from _copy_range(src, dst, lo, hi, emit)
+            # Compact the run boundaries in place for the next pass
+            runs[kept] = hi
+            kept += 1
+        del runs[kept:]
+        src, dst = dst, src
+
+    if src is not a:
+        yield from _copy_range(src, a, 0, n, True)
+    yield (ALLOC, -allocated, 0)
+
+
+def merge(src, dst, lo, mid, hi, emit=True):
+    # Merges src[lo:mid] and src[mid:hi] into dst[lo:hi]
+    yield (COMPARE, mid-1, mid)
+    if not src[mid] < src[mid-1]:
+        # Runs are already in order; nothing to merge
+        yield from _copy_range(src, dst, lo, hi, emit)
+        return
+
+    i = lo
+    j = mid
+    k = lo
+
+    while i < mid and j < hi:
+        yield (COMPARE, i, j)
+        if src[j] < src[i]:
+            dst[k] = src[j]
+            j += 1
+        else:
+            dst[k] = src[i]
+            i += 1
+        if emit:
+            yield (WRITE, k, dst[k])
+        k += 1
+
+    while i < mid:
+        dst[k] = src[i]
+        if emit:
+            yield (WRITE, k, dst[k])
+        i += 1
+        k += 1
+
+    while j < hi:
+        dst[k] = src[j]
+        if emit:
+            yield (WRITE, k, dst[k])
+        j += 1
+        k += 1
+
+
+def _copy_range(src, dst, lo, hi, emit):
+    if src is dst:
+        return
+    for k in range(lo, hi):
+        dst[k] = src[k]
+        if emit:
+            yield (WRITE, k, dst[k])
+
+
+def _insertion_sort_range(a, lo, hi):
+    # Insertion sort of a[lo:hi]; used for small ranges inside other sorts
+    for i in range(lo + 1, hi):
+        key = a[i]
+        j = i - 1
+        while j >= lo:
+            yield (COMPARE, i, j)
+            if not key < a[j]:
+                break
+            a[j+1] = a[j]
+            yield (WRITE, j+1, a[j])
+            j -= 1
+        if j + 1 != i:
+            a[j+1] = key
+            yield (WRITE, j+1, key)
+
+
+# Introsort: quicksort with ninther/median-of-three pivots and three-way
+# partitioning, insertion sort for small ranges and a heapsort fallback
+# once the recursion gets deeper than 2*log2(n).
+
+def intro_sort(a, cutoff=16):
+    n = len(a)
+    if n < 2:
+        return
+    depth_limit = 2 * int(math.log2(n))
+    yield from _intro_loop(a, 0, n - 1, depth_limit, cutoff)
+
+
+def _intro_loop(a, lo, hi, depth, cutoff, level=1):
+    yield (DEPTH, level, 0)
+    while hi - lo + 1 > cutoff:
+        if depth == 0:
+            yield from _heap_sort_range(a, lo, hi + 1)
+            return
+        depth -= 1
+
+        p = yield from _choose_pivot(a, lo, hi)
+        lt, gt = yield from _partition3(a, lo, hi, p)
+
+        # Smaller side recursively, larger side in this loop
+        if lt - lo < hi - gt:
+            yield from _intro_loop(a, lo, lt - 1, depth, cutoff, level + 1)
+            lo = gt + 1
+        else:
+            yield from _intro_loop(a, gt + 1, hi, depth, cutoff, level + 1)
+            hi = lt - 1
+
+    yield from _insertion_sort_range(a, lo, hi + 1)
+
+
+def _median3(a, i, j, k):
+    yield (COMPARE, i, j)
+    if a[i] < a[j]:
+        yield (COMPARE, j, k)
+        if a[j] < a[k]:
+            return j
+        yield (COMPARE, i, k)
+        return k if a[i] < a[k] else i
+    yield (COMPARE, i, k)
+    if a[i] < a[k]:
+        return i
+    yield (COMPARE, j, k)
+    return k if a[j] < a[k] else j
+
+
+def _choose_pivot(a, lo, hi):
+    mid = (lo + hi) // 2
+    if hi - lo < 40:
+        return (yield from _median3(a, lo, mid, hi))
+
+    # Tukey's ninther: median of three medians-of-three
+    step = (hi - lo + 1) // 8
+    m1 = yield from _median3(a, lo, lo + step, lo + 2 * step)
+    m2 = yield from _median3(a, mid - step, mid, mid + step)
+    m3 = yield from _median3(a, hi - 2 * step, hi - step, hi)
+    return (yield from _median3(a, m1, m2, m3))
+
+
+def _partition3(a, lo, hi, p):
+    # Dijkstra three-way partition around a[p]. Afterwards a[lo:lt] < v,
+    # a[lt:gt+1] == v and a[gt+1:hi+1] > v; returns (lt, gt).
+    if p != lo:
+        a[lo], a[p] = a[p], a[lo]
+        yield (SWAP, lo, p)
+    v = a[lo]
+    lt = lo
+    i = lo + 1
+    gt = hi
+
+    while i <= gt:
+        yield (COMPARE, i, lt)
+        if a[i] < v:
+            a[lt], a[i] = a[i], a[lt]
+            yield (SWAP, lt, i)
+            lt += 1
+            i += 1
+            continue
+        yield (COMPARE, i, lt)
+        if a[i] > v:
+            a[i], a[gt] = a[gt], a[i]
+            yield (SWAP, i, gt)
+            gt -= 1
+        else:
+            i += 1
+
+    return lt, gt
+
+
+# Heap sort lives in heap_engine, which the heap visualizer shares. It is
+# imported on first use because heap_engine builds on the opcodes above.
+
+def heap_sort(a, arity=2, mode="classic"):
+    from heap_engine import heap_sort_range
+    yield from heap_sort_range(a, 0, len(a), arity, mode)
+
+
+def _heap_sort_range(a, lo, hi):
+    from heap_engine import heap_sort_range
+    yield from heap_sort_range(a, lo, hi)
+
+
+# Linear-time sorts for integer keys. They make no comparisons between
+# elements; all of their events are writes.
+
+def counting_sort(a):
+    n = len(a)
+    if n < 2:
+        return
+    lo = min(a)
+    counts = [0] * (max(a) - lo + 1)
+    yield (ALLOC, len(counts), 0)
+    for v in a:
+        counts[v - lo] += 1
+
+    k = 0
+    for offset, c in enumerate(counts):
+        v = offset + lo
+        for _ in range(c):
+            a[k] = v
+            yield (WRITE, k, v)
+            k += 1
+    yield (ALLOC, -len(counts), 0)
+
+
+def radix_sort_lsd(a, radix=10):
+    if radix < 2:
+        raise ValueError("radix must be at least 2")
+    n = len(a)
+    if n < 2:
+        return
+    lo = min(a)
+    span = max(a) - lo
+
+    exp = 1
+    while exp <= span:
+        buckets = [[] for _ in range(radix)]
+        yield (ALLOC, n + radix, 0)
+        for v in a:
+            buckets[(v - lo) // exp % radix].append(v)
+
+        k = 0
+        for bucket in buckets:
+            for v in bucket:
+                a[k] = v
+                yield (WRITE, k, v)
+                k += 1
+        del buckets
+        yield (ALLOC, -(n + radix), 0)
+        exp *= radix
+
+
+def radix_sort_msd(a, radix=10, cutoff=16):
+    if radix < 2:
+        raise ValueError("radix must be at least 2")
+    n = len(a)
+    if n < 2:
+        return
+    lo = min(a)
+    span = max(a) - lo
+
+    exp = 1
+    while exp * radix <= span:
+        exp *= radix
+    yield from _msd_pass(a, 0, n, lo, exp, radix, cutoff)
+
+
+def _msd_pass(a, start, end, lo, exp, radix, cutoff, depth=1):
+    yield (DEPTH, depth, 0)
+    if end - start < 2 or exp == 0:
+        return
+    if end - start <= cutoff:
+        yield from _insertion_sort_range(a, start, end)
+        return
+
+    buckets = [[] for _ in range(radix)]
+    yield (ALLOC, end - start + radix, 0)
+    for v in a[start:end]:
+        buckets[(v - lo) // exp % radix].append(v)
+
+    k = start
+    bounds = []
+    for bucket in buckets:
+        bounds.append(k)
+        for v in bucket:
+            a[k] = v
+            yield (WRITE, k, v)
+            k += 1
+    bounds.append(end)
+    del buckets
+    yield (ALLOC, -(end - start + radix), 0)
+
+    for b in range(radix):
+        yield from _msd_pass(a, bounds[b], bounds[b+1], lo, exp // radix, radix, cutoff, depth + 1)
+
+
+def bucket_sort(a, bucket_count=None):
+    n = len(a)
+    if n < 2:
+        return
+    lo = min(a)
+    hi = max(a)
+    if lo == hi:
+        return
+    m = bucket_count or n
+    scale = m / (hi - lo)
+
+    buckets = [[] for _ in range(m)]
+    yield (ALLOC, n + m, 0)
+    for v in a:
+        buckets[min(int((v - lo) * scale), m - 1)].append(v)
+
+    k = 0
+    for bucket in buckets:
+        start = k
+        for v in bucket:
+            a[k] = v
+            yield (WRITE, k, v)
+            k += 1
+        if k - start > 1:
+            yield from _insertion_sort_range(a, start, k)
+    yield (ALLOC, -(n + m), 0)
+
+
+ALGORITHMS = {
+    "bubble": bubble_sort,
+    "selection": selection_sort,
+    "insertion": insertion_sort,
+    "quick": quick_sort,
+    "intro": intro_sort,
+    "merge": merge_sort,
+    "heap": heap_sort,
+    "counting": counting_sort,
+    "radix_lsd": radix_sort_lsd,
+    "radix_msd": radix_sort_msd,
+    "bucket": bucket_sort,
+}
+
+
+# NumPy-vectorized paths. These take and return arrays and emit no
+# events; they exist for headless batch work on large inputs.
+
+def counting_sort_numpy(values):
+    a = np.asarray(values)
+    if a.size < 2:
+        return a.copy()
+    # Offsets are taken in int64; in a narrow dtype like int16 they overflow
+    lo = int(a.min())
+    counts = np.bincount(a.astype(np.int64) - lo)
+    return np.repeat(np.arange(lo, lo + counts.size, dtype=a.dtype), counts)
+
+
+def _digit_dtype(radix):
+    # NumPy's stable sort is a radix sort for 16-bit and smaller integer
+    # types, so digit passes stay linear as long as digits fit in uint16
+    if radix < 2 or radix > 1 << 16:
+        raise ValueError("radix must be between 2 and 65536")
+    return np.uint8 if radix <= 1 << 8 else np.uint16
+
+
+def _lsd_passes(keys, exp_limit, radix, dtype):
+    exp = 1
+    while exp <= exp_limit:
+        digits = (keys // exp % radix).astype(dtype)
+        keys = keys[np.argsort(digits, kind='stable')]
+        exp *= radix
+    return keys
+
+
+def radix_sort_lsd_numpy(values, radix=10):
+    dtype = _digit_dtype(radix)
+    a = np.asarray(values, dtype=np.int64)
+    if a.size < 2:
+        return a.copy()
+    lo = a.min()
+    return _lsd_passes(a - lo, a.max() - lo, radix, dtype) + lo
+
+
+def radix_sort_msd_numpy(values, radix=10, cutoff=4096):
+    dtype = _digit_dtype(radix)
+    a = np.asarray(values, dtype=np.int64)
+    if a.size < 2:
+        return a.copy()
+    lo = a.min()
+    keys = a - lo
+    span = keys.max()
+
+    exp = 1
+    while exp * radix <= span:
+        exp *= radix
+    _msd_pass_numpy(keys, exp, radix, cutoff, dtype)
+    return keys + lo
+
+
+def _msd_pass_numpy(keys, exp, radix, cutoff, dtype):
+    # Sorts the view `keys` in place on the digits at exp and below
+    if keys.size < 2 or exp == 0:
+        return
+    if keys.size <= cutoff:
+        # Small buckets finish with LSD passes over the remaining digits
+        keys[:] = _lsd_passes(keys, exp, radix, dtype)
+        return
+
+    digits = (keys // exp % radix).astype(dtype)
+    keys[:] = keys[np.argsort(digits, kind='stable')]
+    bounds = np.cumsum(np.bincount(digits, minlength=radix))
+
+    start = 0
+    for end in bounds.tolist():
+        if end - start > 1:
+            _msd_pass_numpy(keys[start:end], exp // radix, radix, cutoff, dtype)
+        start = end
+
+
+def bucket_sort_numpy(values, bucket_count=None):
+    a = np.asarray(values)
+    if a.size < 2:
+        return a.copy()
+    lo = a.min()
+    hi = a.max()
+    if lo == hi:
+        return a.copy()
+    m = bucket_count or a.size
+    # Offsets are taken in float64, which cannot overflow for narrow dtypes
+    # and keeps bucket ids non-decreasing in the value
+    span = float(hi) - float(lo)
+    scale = m / span if span else 0.0
+    offsets = a.astype(np.float64) - float(lo)
+    buckets = np.minimum((offsets * scale).astype(np.int64), m - 1)
+
+    # Scatter into buckets with stable argsorts on 16-bit digits of the
+    # bucket id, which stay linear like the radix paths
+    order = np.arange(a.size)
+    shift = 0
+    while m - 1 >> shift:
+        digits = (buckets[order] >> shift & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digits, kind='stable')]
+        shift += 16
+    grouped = a[order]
+
+    # Finish each bucket, where bucket_sort runs insertion sort per bucket.
+    # Buckets of the same size are sorted together as the rows of one
+    # (count, size) matrix, so there is one vectorized sort per distinct
+    # size; with about one item per bucket the sizes stay small.
+    sizes = np.bincount(buckets, minlength=m)
+    starts = np.cumsum(sizes) - sizes
+    multi = np.flatnonzero(sizes > 1)
+    multi_sizes = sizes[multi]
+    for k in np.unique(multi_sizes).tolist():
+        rows = starts[multi[multi_sizes == k]][:, None] + np.arange(k)
+        grouped[rows] = np.sort(grouped[rows], axis=1)
+    return grouped
+
+
+NUMPY_ALGORITHMS = {
+    "counting": counting_sort_numpy,
+    "radix_lsd": radix_sort_lsd_numpy,
+    "radix_msd": radix_sort_msd_numpy,
+    "bucket": bucket_sort_numpy,
+}
+
+
+# Pseudo-algorithm that measures the input's presortedness first and
+# dispatches to the cheapest algorithm for it (see presortedness.py)
+AUTO = "auto"
+
+
+def sort_events(a, algorithm, **options):
+    # Generator of events; sorts `a` in place as it is consumed. Options
+    # are not forwarded under AUTO since the target is not known up front.
+    if algorithm == AUTO:
+        algorithm, _ = recommend(a)
+        options = {}
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    return ALGORITHMS[algorithm](a, **options)
+
+
+def sort(data, algorithm="intro", use_numpy=False, **options):
+    # Headless entry point: runs the algorithm to completion without
+    # rendering and returns a new sorted list
+    if algorithm == AUTO:
+        algorithm, _ = recommend(data)
+        options = {}
+        # AUTO may pick a comparison sort, which has no NumPy path
+        use_numpy = use_numpy and algorithm in NUMPY_ALGORITHMS
+    if use_numpy:
+        if np is None:
+            raise ImportError("NumPy is required for use_numpy=True")
+        if algorithm not in NUMPY_ALGORITHMS:
+            raise ValueError(f"No NumPy path for algorithm: {algorithm}")
+        return NUMPY_ALGORITHMS[algorithm](np.asarray(data), **options).tolist()
+
+    a = list(data)
+    deque(sort_events(a, algorithm, **options), maxlen=0)
+    return a
+
+
+def sort_with_stats(data, algorithm="intro", **options):
+    # Like sort(), but also counts every operation; returns (list, SortStats)
+    a = list(data)
+    stats = SortStats()
+    stats.consume(sort_events(a, algorithm, **options))
+    return a, stats
@@ -0,0 +1,220 @@
+import argparse
+import time
+from functools import lru_cache
+
+import sorting_engine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Sorting networks for batches of short arrays.
+#
+# A network is a fixed list of layers; each layer is a list of disjoint
+# comparators (i, j) with i < j that leave the smaller value at i. Because
+# the comparisons do not depend on the data, one layer can be applied to
+# every row of a batch at once with a single vectorized min/max, which
+# removes the per-element interpreter overhead of running a sort per row.
+#
+# Both networks are built for power-of-two widths; narrower rows are padded
+# with the dtype's largest value, which sinks to the padded tail.
+
+
+# Rows per tile in sort_rows; 64 wires x 2048 int64 rows is 1 MB
+TILE_ROWS = 2048
+
+
+def _check_width(n):
+    if n < 1 or n & (n - 1):
+        raise ValueError(f"Network width must be a power of two, got {n}")
+
+
+def bitonic_network(n):
+    # Bitonic sorter in the form where every comparator is ascending: the
+    # first step of each merge compares mirrored positions (i ^ (k - 1))
+    _check_width(n)
+    layers = []
+    k = 2
+    while k <= n:
+        layers.append([(i, i ^ (k - 1)) for i in range(n) if i ^ (k - 1) > i])
+        j = k // 4
+        while j >= 1:
+            layers.append([(i, i ^ j) for i in range(n) if i ^ j > i])
+            j //= 2
+        k *= 2
+    return layers
+
+
+def odd_even_merge_network(n):
+    # Batcher's odd-even merge sort; fewer comparators than bitonic for
+    # the same depth
+    _check_width(n)
+    layers = []
+    p = 1
+    while p < n:
+        k = p
+        while k >= 1:
+            layer = []
+            for j in range(k % p, n - k, 2 * k):
+                for i in range(min(k, n - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p):
+                        layer.append((i + j, i + j + k))
+            layers.append(layer)
+            k //= 2
+        p *= 2
+    return layers
+
+
+NETWORKS = {
+    "bitonic": bitonic_network,
+    "odd_even": odd_even_merge_network,
+}
+
+
+def padded_width(n):
+    width = 1
+    while width < n:
+        width *= 2
+    return width
+
+
+@lru_cache(maxsize=None)
+def network_layers(network, n):
+    # Layers for at least n inputs, cached per (network, width)
+    if network not in NETWORKS:
+        raise ValueError(f"Unknown network: {network}")
+    return tuple(tuple(layer) for layer in NETWORKS[network](padded_width(n)))
+
+
+@lru_cache(maxsize=None)
+def _index_layers(network, n):
+    return [(np.array([i for i, _ in layer]), np.array([j for _, j in layer]))
+            for layer in network_layers(network, n)]
+
+
+def _bitonic_views(wires):
+    # The bitonic layers as pairs of strided views into `wires`, so no
+    # gather/scatter copies are needed; the layer order matches
+    # bitonic_network()
+    n = len(wires)
+    k = 2
+    while k <= n:
+        blocks = wires.reshape(n // k, k, -1)
+        yield blocks[:, :k // 2], blocks[:, k - 1:k // 2 - 1:-1]
+        j = k // 4
+        while j >= 1:
+            halves = wires.reshape(n // (2 * j), 2, j, -1)
+            yield halves[:, 0], halves[:, 1]
+            j //= 2
+        k *= 2
+
+
+def network_events(a, network="bitonic"):
+    # Applies the network to one list in place and yields engine events,
+    # so it can be animated like any other sort. len(a) must be a power
+    # of two here since events cannot refer to padding.
+    _check_width(len(a))
+    for layer in network_layers(network, len(a)):
+        for i, j in layer:
+            yield (sorting_engine.COMPARE, i, j)
+            if a[j] < a[i]:
+                a[i], a[j] = a[j], a[i]
+                yield (sorting_engine.SWAP, i, j)
+
+
+def sort_rows(batch, network="bitonic"):
+    # Returns a copy of the 2-D array `batch` with every row sorted
+    if np is None:
+        raise ImportError("NumPy is required for sort_rows")
+    batch = np.asarray(batch)
+    if batch.ndim != 2:
+        raise ValueError("sort_rows expects a 2-D array")
+    rows, n = batch.shape
+    if n < 2:
+        return batch.copy()
+
+    width = padded_width(n)
+    # One row per wire: each comparator then reads two contiguous rows
+    wires = np.empty((width, rows), dtype=batch.dtype)
+    wires[:n] = batch.T
+    if width > n:
+        if batch.dtype.kind == 'f':
+            wires[n:] = np.inf
+        else:
+            wires[n:] = np.iinfo(batch.dtype).max
+
+    # Rows are processed in tiles so one tile's wires stay in cache
+    # across all layers
+    for start in range(0, rows, TILE_ROWS):
+        tile = np.ascontiguousarray(wires[:, start:start + TILE_ROWS])
+        if network == "bitonic":
+            for lo, hi in _bitonic_views(tile):
+                low = np.minimum(lo, hi)
+                np.maximum(lo, hi, out=hi)
+                lo[...] = low
+        else:
+            for lo, hi in _index_layers(network, width):
+                a = tile[lo]
+                b = tile[hi]
+                tile[lo] = np.minimum(a, b)
+                tile[hi] = np.maximum(a, b)
+        wires[:, start:start + TILE_ROWS] = tile
+
+    return np.ascontiguousarray(wires[:n].T)
+
+
+def benchmark(rows, width, network="bitonic", seed=0, engine_rows=2000):
+    # Times sort_rows against np.sort and a per-row engine insertion sort
+    rng = np.random.default_rng(seed)
+    batch = rng.integers(0, 1 << 30, size=(rows, width), dtype=np.int64)
+
+    start = time.perf_counter()
+    result = sort_rows(batch, network)
+    network_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = np.sort(batch, axis=1)
+    numpy_time = time.perf_counter() - start
+    if not np.array_equal(result, expected):
+        raise AssertionError(f"{network} network gave a wrong result")
+
+    # The per-row engine baseline is slow, so time a slice and scale it
+    sample = batch[:engine_rows].tolist()
+    start = time.perf_counter()
+    for row in sample:
+        sorting_engine.sort(row, "insertion")
+    engine_time = (time.perf_counter() - start) * rows / len(sample)
+
+    layers = network_layers(network, width)
+    return {
+        "rows": rows,
+        "width": width,
+        "network": network,
+        "layers": len(layers),
+        "comparators": sum(len(layer) for layer in layers),
+        "network_time": network_time,
+        "numpy_sort_time": numpy_time,
+        "engine_time": engine_time,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched sorting-network benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--widths", nargs="+", type=int, default=[8, 16, 32, 64])
+    parser.add_argument("--network", choices=list(NETWORKS), default="bitonic")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'width':>5} {'layers':>6} {'comps':>6} {'network (s)':>12} "
+          f"{'np.sort (s)':>12} {'engine est. (s)':>16}")
+    for width in args.widths:
+        r = benchmark(args.rows, width, args.network, args.seed)
+        print(f"{r['width']:>5} {r['layers']:>6} {r['comparators']:>6} "
+              f"{r['network_time']:>12.3f} {r['numpy_sort_time']:>12.3f} "
+              f"{r['engine_time']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from priority_queue import IndexedHeap
+from sorting_engine import BOUNDARY, WRITE
+
+TYPECODES = [None, "q", "d"]
+
+
+def _replay(events, shadow, pushed=None):
+    # Applies an event stream the way the heap visualizer does: WRITE sets
+    # a slot, and a BOUNDARY that changes the size appends the pushed
+    # priority or drops the last slot
+    result = None
+    try:
+        while True:
+            op, a, b = next(events)
+            if op == WRITE:
+                shadow[a] = b
+            elif op == BOUNDARY:
+                if a > len(shadow):
+                    shadow.append(pushed)
+                else:
+                    del shadow[a:]
+    except StopIteration as stop:
+        result = stop.value
+    return result
+
+
+@pytest.mark.parametrize("typecode", TYPECODES)
+def test_event_streams_match_storage(typecode):
+    rng = random.Random(7)
+    q = IndexedHeap(((i, rng.randrange(100)) for i in range(40)), typecode)
+    shadow = list(q.priorities)
+    next_item = 40
+    for _ in range(600):
+        op = rng.randrange(5)
+        if op == 0 or not len(q):
+            priority = rng.randrange(100)
+            _replay(q.push_events(next_item, priority), shadow, priority)
+            next_item += 1
+        elif op == 1:
+            top = q.peek()
+            assert _replay(q.pop_events(), shadow) == top
+        else:
+            item = q.item_at(rng.randrange(len(q)))
+            current = q.priority(item)
+            if op == 2:
+                # Includes raising to the same priority
+                _replay(q.increase_key_events(item, current + rng.randrange(3) * rng.randrange(50)), shadow)
+            elif op == 3:
+                _replay(q.decrease_key_events(item, current - rng.randrange(50)), shadow)
+            else:
+                assert _replay(q.remove_events(item), shadow) == current
+        assert shadow == list(q.priorities)
+        assert q.is_valid()
+
+
+def test_increase_key_in_place_is_written():
+    q = IndexedHeap(enumerate([100, 50, 40, 10, 5]))
+    shadow = list(q.priorities)
+    _replay(q.increase_key_events(3, 20), shadow)
+    assert shadow == list(q.priorities) == [100, 50, 40, 20, 5]
+
+
+@pytest.mark.parametrize("typecode", TYPECODES)
+def test_pops_come_out_in_order(typecode):
+    rng = random.Random(3)
+    q = IndexedHeap(((i, rng.randrange(-50, 50)) for i in range(200)), typecode)
+    for i in range(0, 200, 3):
+        q.update(i, rng.randrange(-50, 50))
+    out = [q.pop()[1] for _ in range(len(q))]
+    assert out == sorted(out, reverse=True)
+
+
+def test_merge():
+    rng = random.Random(5)
+    a = IndexedHeap((i, rng.randrange(100)) for i in range(30))
+    b = IndexedHeap((i, rng.randrange(100)) for i in range(30, 55))
+    expected = sorted(list(a.priorities) + list(b.priorities), reverse=True)
+    a.merge(b)
+    assert a.is_valid() and len(b) == 25
+    assert [a.pop()[1] for _ in range(len(a))] == expected
+
+
+def test_failed_merge_changes_nothing():
+    q = IndexedHeap([(1, 5), (2, 7)], "q")
+    with pytest.raises(ValueError):
+        q.merge(IndexedHeap([(2, 1)]))
+    with pytest.raises(TypeError):
+        q.merge(IndexedHeap([(3, 1), (4, 1.5)]))
+    assert len(q) == 2 and q.is_valid()
+
+
+def test_failed_heapify_changes_nothing():
+    q = IndexedHeap([(1, 5), (2, 7)], "q")
+    with pytest.raises(TypeError):
+        q.heapify([(3, 1.5)])
+    with pytest.raises(ValueError):
+        q.heapify([(3, 1), (3, 2)])
+    assert len(q) == 2 and list(q.priorities) == [7, 5] and q.is_valid()
@@ -0,0 +1,116 @@
+import math
+import random
+
+import pytest
+
+import sorting_engine
+from sorting_engine import ALGORITHMS, NUMPY_ALGORITHMS, sort
+
+# Every engine entry must agree with sorted(). The linear-time sorts index
+# by digit or bucket, so they only get the inputs they are defined for.
+INTEGER_ONLY = {"counting", "radix_lsd", "radix_msd"}
+NUMERIC_ONLY = {"bucket"}
+
+rng = random.Random(2024)
+INT_INPUTS = [
+    [],
+    [7],
+    [3, 3, 3, 3],
+    list(range(50)),
+    list(range(50, 0, -1)),
+    [rng.randrange(-20, 20) for _ in range(200)],
+    # Wide, but small enough for the counting sort's table
+    [rng.randrange(-10 ** 5, 10 ** 5) for _ in range(200)],
+]
+FLOAT_INPUTS = [
+    [0.0, -0.0, 0.0, -0.0, 1.0],
+    [rng.uniform(-5, 5) for _ in range(200)],
+    [rng.choice([-1.5, 0.0, 2.25]) for _ in range(100)],
+]
+
+
+class Item:
+    # Compares by key only, so equal keys are distinct objects
+    __slots__ = ("key", "tag")
+
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __gt__(self, other):
+        return self.key > other.key
+
+    def __le__(self, other):
+        return self.key <= other.key
+
+    def __ge__(self, other):
+        return self.key >= other.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    __hash__ = None
+
+
+def _accepts(name, kind):
+    if kind == "int":
+        return True
+    if kind == "float":
+        return name not in INTEGER_ONLY
+    return name not in INTEGER_ONLY and name not in NUMERIC_ONLY
+
+
+def _check_float(result, data):
+    # Same values in order, and no element replaced by an equal one
+    assert result == sorted(data)
+    assert sorted(map(_signed, result)) == sorted(map(_signed, data))
+
+
+def _signed(v):
+    return v, math.copysign(1, v)
+
+
+@pytest.mark.parametrize("name", ALGORITHMS)
+@pytest.mark.parametrize("data", INT_INPUTS)
+def test_ints_match_sorted(name, data):
+    assert sort(data, name) == sorted(data)
+
+
+@pytest.mark.parametrize("name", [n for n in ALGORITHMS if _accepts(n, "float")])
+@pytest.mark.parametrize("data", FLOAT_INPUTS)
+def test_floats_match_sorted(name, data):
+    _check_float(sort(data, name), data)
+
+
+@pytest.mark.parametrize("name", [n for n in ALGORITHMS if _accepts(n, "object")])
+def test_equal_objects_are_kept(name):
+    data = [Item(rng.randrange(10), i) for i in range(150)]
+    result = sort(data, name)
+    assert [x.key for x in result] == sorted(x.key for x in data)
+    assert sorted(x.tag for x in result) == list(range(150))
+
+
+@pytest.mark.parametrize("data", INT_INPUTS + [[[2], [1], [3]] * 10, list("presortedness")])
+def test_auto_matches_sorted(data):
+    # AUTO profiles the input first, which must not need hashable values
+    assert sort(data, sorting_engine.AUTO) == sorted(data)
+
+
+needs_numpy = pytest.mark.skipif(sorting_engine.np is None, reason="NumPy not installed")
+
+
+@needs_numpy
+@pytest.mark.parametrize("name", NUMPY_ALGORITHMS)
+@pytest.mark.parametrize("data", INT_INPUTS)
+def test_numpy_ints_match_sorted(name, data):
+    assert sort(data, name, use_numpy=True) == sorted(data)
+
+
+@needs_numpy
+@pytest.mark.parametrize("name", [n for n in NUMPY_ALGORITHMS if _accepts(n, "float")])
+@pytest.mark.parametrize("data", FLOAT_INPUTS)
+def test_numpy_floats_match_sorted(name, data):
+    _check_float(sort(data, name, use_numpy=True), data)